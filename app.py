@@ -3,61 +3,140 @@ Brother QL/PT Label Printer REST API
 A Flask-based REST API for controlling Brother QL/PT label printers
 """
 
-from flask import Flask, request, jsonify, g
+from flask import Flask, Response, request, jsonify, g
+from flask.json.provider import DefaultJSONProvider
 from functools import wraps
-import json
 import os
+import re
 import time
+import orjson
 from printer_manager import PrinterManager
 from brother_ql_handler import BrotherQLHandler
-from telemetry import init_telemetry, get_telemetry
+from telemetry import (
+    init_telemetry, get_telemetry, TelemetryQueue, PrintSpan, http_attributes, api_request_attributes,
+    OTHER_ATTRIBUTE_VALUE
+)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson for faster (de)serialization"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def json_response(payload: dict, status: int = 200) -> Response:
+    """Serialize payload with orjson directly, skipping jsonify's plumbing"""
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+# Static response bodies, encoded once at import time
+_HEALTH_BODY = orjson.dumps({'status': 'ok', 'service': 'brother-label-api'})
+_NOT_FOUND_BODY = orjson.dumps({'error': 'Endpoint not found'})
+_INTERNAL_ERROR_BODY = orjson.dumps({'error': 'Internal server error'})
+_PRINTER_NOT_FOUND_BODY = orjson.dumps({'error': 'Printer not found'})
+_PRINT_SUCCESS_TEMPLATE = b'{"success":true,"message":"Print job sent successfully","printer_id":%b}'
+
+# Defaults for /api/print "options"
+DEFAULT_PRINT_OPTIONS = {
+    'font_size': 24,
+    'rotate': 0,
+    'cut': True,
+    'margin': 10,
+    'dpi': None,  # print head resolution of the model
+    'dither': True,
+}
+
+# Matches the opening of a base64 payload value in a raw /api/print body
+_BLOB_KEY_PATTERN = re.compile(rb'"(image_base64|pdf_base64)"\s*:\s*"')
 
 # Load configuration
 CONFIG_FILE = os.getenv('CONFIG_FILE', 'config.json')
 printer_manager = PrinterManager(CONFIG_FILE)
 ql_handler = BrotherQLHandler()
 
-# Initialize telemetry
+# Initialize telemetry; recording happens off the request thread
 telemetry = init_telemetry()
+telemetry_queue = TelemetryQueue(telemetry)
+
+
+def _update_telemetry_config():
+    """Sync config gauges and allowed metric attribute values with the printer config"""
+    printers = printer_manager.get_all_printers()
+    telemetry.update_config_gauges(
+        printers_count=len(printers),
+        api_keys_count=len(printer_manager._api_key_map)
+    )
+    telemetry.set_attribute_limits(
+        # Printers are looked up by id or name, so both are valid printer_id values
+        printer_ids=printer_manager._printer_index.keys(),
+        api_key_names=printer_manager._api_key_map.values()
+    )
 
-# Update config gauges
-telemetry.update_config_gauges(
-    printers_count=len(printer_manager.get_all_printers()),
-    api_keys_count=len(printer_manager._api_key_map)
-)
+
+_update_telemetry_config()
+printer_manager.register_change_callback(_update_telemetry_config)
+
+
+def reinit_after_fork():
+    """
+    Give a forked worker its own printer connections, send threads and telemetry
+    export pipeline; called from gunicorn's post_fork hook (preload_app)
+    """
+    ql_handler.reset_after_fork()
+    telemetry.reinit_after_fork()
+    telemetry_queue.reinit_after_fork()
+
+
+def stop_master_telemetry():
+    """Stop exporting from the gunicorn master; called from its when_ready hook"""
+    telemetry.stop_export()
 
 
 @app.before_request
 def before_request():
     """Store request start time for metrics"""
-    g.start_time = time.time()
+    g.start_ns = time.perf_counter_ns()
+
+    # Resolve once; used by the auth decorator, error paths and after_request.
+    # Unmatched URLs share one value so arbitrary paths can't grow metric cardinality
+    g.endpoint = request.endpoint or OTHER_ATTRIBUTE_VALUE
+    g.method = request.method
 
 
 @app.after_request
 def after_request(response):
     """Record request metrics after each request"""
-    if hasattr(g, 'start_time'):
-        duration_ms = (time.time() - g.start_time) * 1000
-
-        # Get endpoint (route pattern) for better grouping
-        endpoint = request.endpoint or request.path
-
-        telemetry.record_http_duration(
-            duration_ms=duration_ms,
-            endpoint=endpoint,
-            method=request.method,
-            status_code=response.status_code
+    if hasattr(g, 'start_ns'):
+        duration_ms = (time.perf_counter_ns() - g.start_ns) / 1_000_000
+
+        # Endpoint is the route pattern for better grouping
+        endpoint = g.endpoint
+        method = g.method
+        status_code = response.status_code
+
+        telemetry_queue.submit(
+            telemetry.record_http_duration,
+            duration_ms,
+            http_attributes(endpoint, method, status_code)
         )
 
         # Record API request counter
-        api_key_name = g.get('api_key_name')
-        telemetry.record_api_request(
-            endpoint=endpoint,
-            method=request.method,
-            status_code=response.status_code,
-            api_key_name=api_key_name
+        api_key_name = telemetry.norm_api_key_name(g.get('api_key_name'))
+        telemetry_queue.submit(
+            telemetry.record_api_request,
+            api_request_attributes(endpoint, method, status_code, api_key_name)
         )
 
     return response
@@ -70,46 +149,106 @@ def require_api_key(f):
         api_key = request.headers.get('X-API-Key')
 
         if not api_key:
-            telemetry.record_error('missing_api_key', request.endpoint or request.path)
+            telemetry_queue.submit(telemetry.record_error, 'missing_api_key', g.endpoint)
             return jsonify({'error': 'API key is missing'}), 401
 
-        if not printer_manager.validate_api_key(api_key):
-            telemetry.record_error('invalid_api_key', request.endpoint or request.path)
+        digest = PrinterManager.hash_api_key(api_key)
+        api_key_name = printer_manager.get_api_key_name_by_digest(digest)
+
+        if api_key_name is None:
+            telemetry_queue.submit(telemetry.record_error, 'invalid_api_key', g.endpoint)
             return jsonify({'error': 'Invalid API key'}), 403
 
         # Store API key name in Flask's g object for use in request handlers
-        g.api_key_name = printer_manager.get_api_key_name(api_key)
-        g.api_key = api_key  # Store actual key (useful for logging but be careful not to expose)
+        g.api_key_name = api_key_name
 
         return f(*args, **kwargs)
 
     return decorated_function
 
 
+def _parse_print_payload():
+    """
+    Parse the /api/print JSON body without copying the base64 payload
+
+    The image_base64/pdf_base64 value is located in the raw request buffer and
+    returned as a memoryview slice, so only the small control fields are parsed.
+    Falls back to a full parse whenever the value can't be sliced out safely.
+    """
+    if not request.is_json:
+        return request.on_json_loading_failed(None)
+
+    raw = request.get_data(cache=False)
+
+    try:
+        match = _BLOB_KEY_PATTERN.search(raw)
+        if match:
+            start = match.end()
+            end = raw.find(b'"', start)
+
+            # Escaped content can't be sliced verbatim
+            if end != -1 and raw.find(b'\\', start, end) == -1:
+                data = orjson.loads(raw[:start] + raw[end:])
+                key = match.group(1).decode()
+
+                if isinstance(data, dict) and data.get(key) == '':
+                    data[key] = memoryview(raw)[start:end]
+                    return data
+
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError as e:
+        return request.on_json_loading_failed(e)
+
+
+def _health_fast_path(wsgi_app):
+    """
+    WSGI middleware answering GET/HEAD /health before Flask builds a request
+    context, so probes skip routing, request hooks and telemetry entirely
+    """
+    headers = [
+        ('Content-Type', 'application/json'),
+        ('Content-Length', str(len(_HEALTH_BODY))),
+    ]
+
+    def middleware(environ, start_response):
+        if environ.get('PATH_INFO') == '/health':
+            method = environ.get('REQUEST_METHOD')
+            if method == 'GET' or method == 'HEAD':
+                start_response('200 OK', list(headers))
+                return [] if method == 'HEAD' else [_HEALTH_BODY]
+
+        return wsgi_app(environ, start_response)
+
+    return middleware
+
+
+app.wsgi_app = _health_fast_path(app.wsgi_app)
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
-    return jsonify({'status': 'ok', 'service': 'brother-label-api'}), 200
+    """Health check endpoint (normally answered by _health_fast_path)"""
+    return Response(_HEALTH_BODY, status=200, mimetype='application/json')
 
 
 @app.route('/api/printers', methods=['GET'])
 @require_api_key
 def list_printers():
     """List all configured printers"""
-    printers = printer_manager.get_all_printers()
-    return jsonify({'printers': printers}), 200
+    body = printer_manager.get_all_printers_json()
+    return Response(body, status=200, mimetype='application/json')
 
 
 @app.route('/api/printers/<printer_id>', methods=['GET'])
 @require_api_key
 def get_printer(printer_id):
     """Get details of a specific printer"""
-    printer = printer_manager.get_printer(printer_id)
+    body = printer_manager.get_printer_json(printer_id)
 
-    if not printer:
-        return jsonify({'error': 'Printer not found'}), 404
+    if body is None:
+        return Response(_PRINTER_NOT_FOUND_BODY, status=404, mimetype='application/json')
 
-    return jsonify({'printer': printer}), 200
+    return Response(body, status=200, mimetype='application/json')
 
 
 @app.route('/api/print', methods=['POST'])
@@ -155,102 +294,93 @@ def print_label():
         }
     }
     """
-    print_start_time = time.time()
-    printer_id = None
-    printer_model = None
-    label_type = None
-    api_key_name = g.get('api_key_name')
+    print_start_ns = time.perf_counter_ns()
+    # Always set by require_api_key; bound once for every telemetry call below
+    api_key_name = g.api_key_name
+    span = None
 
     try:
-        data = request.get_json()
+        data = _parse_print_payload()
 
         if not data:
-            telemetry.record_error('no_json_data', 'print_label', api_key_name)
-            return jsonify({'error': 'No JSON data provided'}), 400
+            telemetry_queue.submit(telemetry.record_error, 'no_json_data', 'print_label', api_key_name)
+            return json_response({'error': 'No JSON data provided'}, 400)
 
         printer_id = data.get('printer_id')
         if not printer_id:
-            telemetry.record_error('missing_printer_id', 'print_label', api_key_name)
-            return jsonify({'error': 'printer_id is required'}), 400
+            telemetry_queue.submit(telemetry.record_error, 'missing_printer_id', 'print_label', api_key_name)
+            return json_response({'error': 'printer_id is required'}, 400)
 
         # Get printer configuration
         printer = printer_manager.get_printer(printer_id)
         if not printer:
-            telemetry.record_error('printer_not_found', 'print_label', api_key_name)
-            return jsonify({'error': f'Printer {printer_id} not found'}), 404
-
-        printer_model = printer.get('model', 'unknown')
+            telemetry_queue.submit(telemetry.record_error, 'printer_not_found', 'print_label', api_key_name)
+            return json_response({'error': f'Printer {printer_id} not found'}, 404)
 
         # Determine label type
-        label_type = 'text' if 'text' in data else 'image' if 'image_base64' in data else 'unknown'
-
-        # Record print attempt
-        telemetry.record_print_attempt(
-            printer_id=printer_id,
-            printer_model=printer_model,
-            label_type=label_type,
-            api_key_name=api_key_name
-        )
-
-        # Extract print options
-        options = data.get('options', {})
-
-        # Handle text, image, or PDF based printing
         if 'text' in data:
-            # Measure image generation time
-            image_gen_start = time.time()
-            result = ql_handler.print_text(
-                printer=printer,
-                text=data['text'],
-                font_size=options.get('font_size', 24),
-                rotate=options.get('rotate', 0),
-                cut=options.get('cut', True),
-                margin=options.get('margin', 10)
-            )
-            image_gen_duration = (time.time() - image_gen_start) * 1000
-            telemetry.record_image_generation(image_gen_duration, 'text')
-
+            label_type = 'text'
         elif 'image_base64' in data:
-            image_gen_start = time.time()
-            result = ql_handler.print_image(
-                printer=printer,
-                image_base64=data['image_base64'],
-                rotate=options.get('rotate', 0),
-                cut=options.get('cut', True),
-                margin=options.get('margin', 10)
-            )
-            image_gen_duration = (time.time() - image_gen_start) * 1000
-            telemetry.record_image_generation(image_gen_duration, 'image')
-
+            label_type = 'image'
         elif 'pdf_base64' in data:
-            image_gen_start = time.time()
-            result = ql_handler.print_pdf(
-                printer=printer,
-                pdf_base64=data['pdf_base64'],
-                rotate=options.get('rotate', 0),
-                cut=options.get('cut', True),
-                margin=options.get('margin', 10),
-                dpi=options.get('dpi', 300)
-            )
-            image_gen_duration = (time.time() - image_gen_start) * 1000
-            telemetry.record_image_generation(image_gen_duration, 'pdf')
-
+            label_type = 'pdf'
         else:
-            telemetry.record_error('invalid_print_data', 'print_label', api_key_name)
-            return jsonify({'error': 'Either text, image_base64, or pdf_base64 is required'}), 400
+            telemetry_queue.submit(telemetry.record_error, 'invalid_print_data', 'print_label', api_key_name)
+            return json_response({'error': 'Either text, image_base64, or pdf_base64 is required'}, 400)
 
-        # Calculate total print duration
-        print_duration_ms = (time.time() - print_start_time) * 1000
+        # Extract print options
+        options = {**DEFAULT_PRINT_OPTIONS, **data.get('options', {})}
+
+        # Records the attempt now and success/failure with total duration on exit
+        with PrintSpan(
+            telemetry_queue,
+            printer_id=printer_id,
+            printer_model=printer.get('model', 'unknown'),
+            label_type=label_type,
+            endpoint='print_label',
+            api_key_name=api_key_name,
+            start_ns=print_start_ns
+        ) as span:
+            # Handle text, image, or PDF based printing
+            if label_type == 'text':
+                result = ql_handler.print_text(
+                    printer=printer,
+                    text=data['text'],
+                    font_size=options['font_size'],
+                    rotate=options['rotate'],
+                    cut=options['cut'],
+                    margin=options['margin']
+                )
+            elif label_type == 'image':
+                result = ql_handler.print_image(
+                    printer=printer,
+                    image_base64=data['image_base64'],
+                    rotate=options['rotate'],
+                    cut=options['cut'],
+                    margin=options['margin'],
+                    dither=options['dither']
+                )
+            else:
+                result = ql_handler.print_pdf(
+                    printer=printer,
+                    pdf_base64=data['pdf_base64'],
+                    rotate=options['rotate'],
+                    cut=options['cut'],
+                    margin=options['margin'],
+                    dpi=options['dpi'],
+                    dither=options['dither']
+                )
+
+            span.mark_image_gen_done()
+            span.result = result
+
+        for render_ms in result.get('page_render_ms', ()):
+            telemetry_queue.submit(telemetry.record_image_generation, render_ms, 'pdf_page')
 
         if result['success']:
-            # Record success metrics
-            telemetry.record_print_success(
-                printer_id=printer_id,
-                printer_model=printer_model,
-                label_type=label_type,
-                duration_ms=print_duration_ms,
-                api_key_name=api_key_name
-            )
+            if 'pages_total' not in result:
+                body = _PRINT_SUCCESS_TEMPLATE % orjson.dumps(printer_id)
+                return Response(body, status=200, mimetype='application/json')
 
             response_data = {
                 'success': True,
@@ -258,57 +388,35 @@ def print_label():
                 'printer_id': printer_id
             }
 
-            # Add PDF-specific info if available
-            if 'pages_total' in result:
-                response_data['pages_total'] = result['pages_total']
-                response_data['pages_successful'] = result['pages_successful']
-                response_data['pages_failed'] = result['pages_failed']
-                if result.get('page_results'):
-                    response_data['page_results'] = result['page_results']
+            # Add PDF-specific info
+            response_data['pages_total'] = result['pages_total']
+            response_data['pages_successful'] = result['pages_successful']
+            response_data['pages_failed'] = result['pages_failed']
+            if result.get('page_results'):
+                response_data['page_results'] = result['page_results']
 
-            return jsonify(response_data), 200
+            return json_response(response_data)
         else:
-            # Record failure metrics
-            error_type = result.get('error_type', 'unknown_error')
-            telemetry.record_print_failure(
-                printer_id=printer_id,
-                printer_model=printer_model,
-                error_type=error_type,
-                duration_ms=print_duration_ms,
-                api_key_name=api_key_name
-            )
-            telemetry.record_error(error_type, 'print_label', api_key_name)
-
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': result.get('error', 'Unknown error')
-            }), 500
+            }, 500)
 
     except Exception as e:
-        # Record exception
-        print_duration_ms = (time.time() - print_start_time) * 1000
-
-        if printer_id and printer_model:
-            telemetry.record_print_failure(
-                printer_id=printer_id,
-                printer_model=printer_model,
-                error_type='exception',
-                duration_ms=print_duration_ms,
-                api_key_name=api_key_name
-            )
-
-        telemetry.record_error('exception', 'print_label', api_key_name)
-        return jsonify({'error': str(e)}), 500
+        # Exceptions inside the span were already recorded as print failures
+        if span is None:
+            telemetry_queue.submit(telemetry.record_error, 'exception', 'print_label', api_key_name)
+        return json_response({'error': str(e)}, 500)
 
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({'error': 'Endpoint not found'}), 404
+    return Response(_NOT_FOUND_BODY, status=404, mimetype='application/json')
 
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({'error': 'Internal server error'}), 500
+    return Response(_INTERNAL_ERROR_BODY, status=500, mimetype='application/json')
 
 
 if __name__ == '__main__':
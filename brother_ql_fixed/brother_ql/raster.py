@@ -240,6 +240,17 @@ class BrotherQLRaster(object):
             frames.append(bytes(image.tobytes(encoder_name='raw')))
         frame_len = len(frames[0])
         row_len = images[0].size[0]//8
+        if not self._compression and len(frames) == 1:
+            # Every uncompressed row carries the same header, so frame them all in one join
+            if self.model.startswith('PT'):
+                header = b'\x47' + bytes([row_len%256, row_len//256])
+            else:
+                header = b'\x67\x00' + bytes([row_len])
+            frame = frames[0]
+            rows = [frame[start:start+row_len] for start in range(0, frame_len - row_len + 1, row_len)]
+            if rows:
+                self.data += header + header.join(rows)
+            return
         start = 0
         file_str = BytesIO()
         while start + row_len <= frame_len:
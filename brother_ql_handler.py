@@ -4,13 +4,21 @@ Implements the printing logic with support for multiple Brother printer librarie
 Supports: brother_ql (for QL series), labelprinterkit (for PT series)
 """
 
-import base64
+import binascii
+import importlib.util
 import io
 import tempfile
 import os
+import queue
+import select
 import socket
-from typing import Dict, List, Optional
-from PIL import Image, ImageDraw, ImageFont
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cache, lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from PIL import Image, ImageDraw, ImageFont, ImageOps
 
 try:
     import fitz  # PyMuPDF
@@ -18,50 +26,447 @@ try:
 except ImportError:
     PDF_SUPPORT = False
 
+try:
+    import pybase64  # SIMD base64 (libbase64)
+    PYBASE64_SUPPORT = True
+except ImportError:
+    PYBASE64_SUPPORT = False
+
+
+def _decode_base64(data: Union[str, bytes, memoryview]) -> bytes:
+    """
+    Decode base64 data from a str or bytes-like object
+    Buffers are decoded in place, avoiding the input copy base64.b64decode makes;
+    ASCII str input is decoded directly without an intermediate encode
+    """
+    if PYBASE64_SUPPORT:
+        return pybase64.b64decode(data, validate=False)
+    return binascii.a2b_base64(data)
+
+
+@lru_cache(maxsize=128)
+def _construct_identifier(connection: str, address: str, port: Optional[int] = None) -> Tuple[str, str]:
+    """Build the brother_ql (identifier, backend) pair; cached per connection"""
+    if connection == 'network':
+        if port:
+            identifier = f"tcp://{address}:{port}"
+        else:
+            identifier = f"tcp://{address}"
+        backend = 'network'
+    elif connection == 'usb':
+        identifier = f"usb://{address}"
+        backend = 'pyusb'
+    elif connection == 'serial':
+        identifier = f"file://{address}"
+        backend = 'linux_kernel'
+    else:
+        # Unknown connection type, treat as network
+        identifier = f"tcp://{address}"
+        backend = 'network'
+
+    return identifier, backend
+
+
+@lru_cache(maxsize=128)
+def _parse_tcp_identifier(identifier: str) -> Tuple[str, int]:
+    """Split a tcp://host[:port] identifier into host and port"""
+    host_port = identifier.replace('tcp://', '')
+    if ':' in host_port:
+        host, port = host_port.rsplit(':', 1)
+        return host, int(port)
+    return host_port, 9100  # Default Brother printer port
+
+
+def _socket_is_open(sock: socket.socket) -> bool:
+    """Check that the peer has not closed an idle connection"""
+    try:
+        if hasattr(select, 'poll'):
+            # poll() rather than select(), which rejects descriptors >= FD_SETSIZE
+            poller = select.poll()
+            poller.register(sock, select.POLLIN)
+            readable = poller.poll(0)
+        else:
+            readable, _, _ = select.select([sock], [], [], 0)
+        if not readable:
+            return True
+        # Readable while idle means either status bytes or EOF
+        return sock.recv(1, socket.MSG_PEEK) != b''
+    except (OSError, ValueError):
+        return False
+
+
+class _TCPConnectionPool:
+    """
+    Keeps one idle TCP connection per printer so back-to-back jobs skip the handshake
+    Sockets are checked out while sending, so jobs for different printers never wait on each other
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 16,
+        idle_timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        send_timeout: float = 10.0
+    ):
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.send_timeout = send_timeout
+        self.reset()
+
+    def reset(self):
+        """Forget all pooled connections (e.g. copies inherited by a forked process)"""
+        self._connections = OrderedDict()  # (host, port) -> (socket, last used)
+        self._lock = threading.Lock()
+
+    def _connect(self, host: str, port: int) -> socket.socket:
+        """Open a connection tuned for single large writes"""
+        sock = socket.create_connection((host, port), timeout=self.connect_timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+        sock.settimeout(self.send_timeout)
+        return sock
+
+    def _checkout(self, key: Tuple[str, int]) -> Tuple[socket.socket, bool]:
+        """Take the idle connection for a printer, or open a new one"""
+        with self._lock:
+            entry = self._connections.pop(key, None)
+
+        if entry is not None:
+            sock, last_used = entry
+            if time.monotonic() - last_used < self.idle_timeout and _socket_is_open(sock):
+                return sock, True
+            sock.close()
+
+        return self._connect(*key), False
+
+    def _checkin(self, key: Tuple[str, int], sock: socket.socket):
+        """Return a connection to the pool, closing whatever it displaces"""
+        stale = []
+        with self._lock:
+            previous = self._connections.pop(key, None)
+            if previous is not None:
+                stale.append(previous[0])
+            self._connections[key] = (sock, time.monotonic())
+            while len(self._connections) > self.max_connections:
+                stale.append(self._connections.popitem(last=False)[1][0])
+
+        for old in stale:
+            old.close()
+
+    def send(self, host: str, port: int, data: bytes):
+        """Send a complete job in one sendall, reconnecting once if a pooled connection went stale"""
+        key = (host, port)
+        sock, reused = self._checkout(key)
+        try:
+            sock.sendall(data)
+        except OSError:
+            sock.close()
+            if not reused:
+                raise
+            sock = self._connect(host, port)
+            try:
+                sock.sendall(data)
+            except OSError:
+                sock.close()
+                raise
+
+        self._checkin(key, sock)
+
+
+class _PrinterWorker:
+    """
+    Sends jobs for one network printer from a dedicated thread
+    Jobs are serialized per printer; any that queue up during a send go out together in the next sendall
+    """
+
+    max_batch = 32
+
+    def __init__(self, pool: _TCPConnectionPool, host: str, port: int):
+        self.pool = pool
+        self.host = host
+        self.port = port
+        self._jobs = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=f'printer-{host}:{port}', daemon=True)
+        self._thread.start()
+
+    def submit(self, data: bytes) -> Future:
+        """Queue instructions for the printer; the future resolves once they are sent"""
+        future = Future()
+        self._jobs.put((data, future))
+        return future
+
+    def _run(self):
+        """Send queued jobs, batching whatever arrived while the last send was in flight"""
+        while True:
+            batch = [self._jobs.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._jobs.get_nowait())
+                except queue.Empty:
+                    break
+
+            data = batch[0][0] if len(batch) == 1 else b''.join(job for job, _ in batch)
+            try:
+                self.pool.send(self.host, self.port, data)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for _, future in batch:
+                    future.set_result(None)
+
+
+# Image.rotate angles (counter-clockwise) mapped to the equivalent lossless transpose
+_ROTATE_TRANSPOSE = {
+    90: Image.Transpose.ROTATE_90,
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_270
+}
+
+
+def _rotate(image: Image.Image, rotate: int) -> Image.Image:
+    """Rotate by 90, 180 or 270 degrees with a plain pixel transpose; other angles are ignored"""
+    method = _ROTATE_TRANSPOSE.get(rotate)
+    return image if method is None else image.transpose(method)
+
+
+@lru_cache(maxsize=8)
+def _threshold_lut(threshold: float) -> tuple:
+    """
+    Build a 256-entry L -> 1 lookup table
+    Same cutoff as brother_ql's threshold option. brother_ql inverts the image before
+    comparing, so grey level v prints black when 255 - v >= cutoff, i.e. the darkest
+    256 - cutoff levels (180 at the default 70) map to black here.
+    """
+    cutoff = min(255, max(0, int((100.0 - threshold) / 100.0 * 255)))
+    return (0,) * (256 - cutoff) + (255,) * cutoff
+
+
+def _to_monochrome(
+    image: Image.Image,
+    threshold: Optional[float] = None,
+    dither: bool = True
+) -> Image.Image:
+    """
+    Convert an image to 1-bit
+    Floyd-Steinberg error diffusion by default; Pillow runs the 7/16, 3/16, 5/16, 1/16 kernel
+    in C, so no Python-level loop is needed. With a threshold, a single LUT pass is used instead;
+    with dither=False, Pillow's plain 50% threshold.
+    """
+    if image.mode == '1':
+        return image
+    if threshold is not None:
+        if image.mode != 'L':
+            image = image.convert('L')
+        return image.point(_threshold_lut(threshold), mode='1')
+    return image.convert('1', dither=Image.Dither.FLOYDSTEINBERG if dither else Image.Dither.NONE)
+
+
+# Common font locations, tried in order
+_FONT_PATHS = (
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "C:\\Windows\\Fonts\\arial.ttf",
+    "/System/Library/Fonts/Helvetica.ttc"
+)
+_DEFAULT_FONT = ImageFont.load_default()
+# Scratch canvas, only used to measure multiline text
+_MEASURE_DRAW = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+_font_path: Optional[str] = None
+
+
+def _resolve_font_path() -> str:
+    """Find the first available font file once; empty string if none exist"""
+    global _font_path
+    if _font_path is None:
+        _font_path = next((path for path in _FONT_PATHS if os.path.exists(path)), '')
+    return _font_path
+
+
+@lru_cache(maxsize=32)
+def _load_font(size: int) -> ImageFont.ImageFont:
+    """Load the label font at the given size, falling back to Pillow's default"""
+    path = _resolve_font_path()
+    if path:
+        try:
+            return ImageFont.truetype(path, size)
+        except (OSError, ValueError):
+            pass
+    return _DEFAULT_FONT
+
+
+# brother_ql's threshold option: pixels at least 30% dark (grey level < 180) print black
+BLACK_THRESHOLD = 70.0
+
+# Print head resolution; PDF pages rendered above it only add pixels that get thrown away
+QL_HEAD_DPI = 300
+PT_HEAD_DPI = 180
+
+# PDF pages with a larger grayscale pixmap (bytes) are rendered in strips of about PDF_STRIP_BYTES
+PDF_STRIP_THRESHOLD = 16 * 1024 * 1024
+PDF_STRIP_BYTES = 4 * 1024 * 1024
+
+# PDF pages sent to brother_ql as one raster instruction stream; bounds the 1-bit pages held in memory
+PDF_BATCH_PAGES = 8
+
+# Seconds a discover_printers() result is reused
+DISCOVERY_CACHE_TTL = 30.0
+
+# Rendered text label rasters kept for repeat prints (serial sticker runs etc.)
+TEXT_RASTER_CACHE_SIZE = 256
+
+# Model family prefixes; tuples so startswith() covers new families without extra checks
+PT_PREFIXES = ('PT-',)
+QL_PREFIXES = ('QL-',)
+
+# Supported PT series models
+_SUPPORTED_PT_MODELS = frozenset({
+    'PT-P710BT', 'PT-E550W', 'PT-P750W', 'PT-P900',
+    'PT-P900W', 'PT-P950NW', 'PT-H500', 'PT-P700', 'PT-P300BT'
+})
+
+# Supported QL series models (compatible with brother_ql)
+_SUPPORTED_QL_MODELS = frozenset({
+    'QL-500', 'QL-550', 'QL-560', 'QL-570', 'QL-580N', 'QL-650TD',
+    'QL-700', 'QL-710W', 'QL-720NW', 'QL-800', 'QL-810W', 'QL-820NWB',
+    'QL-1050', 'QL-1060N', 'QL-1100', 'QL-1115NWB'
+})
+
+
+class PrinterConfig(NamedTuple):
+    """Connection details of a printer, read once per job instead of per dict lookup"""
+    connection: str = 'network'
+    address: Optional[str] = None
+    port: Optional[int] = 9100
+    model: str = 'QL-820NWB'
+    label_size: str = '62'
+
+    @classmethod
+    def from_printer(cls, printer: Union[Dict, 'PrinterConfig']) -> 'PrinterConfig':
+        """Build from a printer configuration dict (as stored in config.json)"""
+        if isinstance(printer, cls):
+            return printer
+        return cls(
+            printer.get('connection', 'network'),
+            printer.get('address'),
+            printer.get('port', 9100),
+            printer.get('model', 'QL-820NWB'),
+            printer.get('label_size', '62')
+        )
+
+
+def max_dpi_for_model(model: str) -> int:
+    """Return the print head resolution for a printer model"""
+    return PT_HEAD_DPI if model.startswith(PT_PREFIXES) else QL_HEAD_DPI
+
+
+@cache
+def _has_brother_ql() -> bool:
+    """Check if brother_ql library is available"""
+    return importlib.util.find_spec('brother_ql') is not None
+
+
+@cache
+def _load_brother_ql() -> tuple:
+    """Import the brother_ql entry points once, on first print"""
+    from brother_ql.conversion import convert
+    from brother_ql.backends.helpers import send
+    from brother_ql.raster import BrotherQLRaster
+    return convert, send, BrotherQLRaster
+
+
+@cache
+def _has_labelprinterkit() -> bool:
+    """Check if labelprinterkit is available"""
+    return importlib.util.find_spec('labelprinterkit') is not None
+
 
 class BrotherQLHandler:
     """Handles Brother QL/PT/QL printer operations with multiple backend support"""
 
     def __init__(self):
         """Initialize the Brother QL/PT handler and detect available libraries"""
-        # Supported PT series models
-        self.supported_pt_models = [
-            'PT-P710BT', 'PT-E550W', 'PT-P750W', 'PT-P900',
-            'PT-P900W', 'PT-P950NW', 'PT-H500', 'PT-P700', 'PT-P300BT'
-        ]
+        self.supported_pt_models = _SUPPORTED_PT_MODELS
+        self.supported_ql_models = _SUPPORTED_QL_MODELS
+        self.supported_models = _SUPPORTED_PT_MODELS | _SUPPORTED_QL_MODELS
 
-        # Supported QL series models (compatible with brother_ql)
-        self.supported_ql_models = [
-            'QL-500', 'QL-550', 'QL-560', 'QL-570', 'QL-580N', 'QL-650TD',
-            'QL-700', 'QL-710W', 'QL-720NW', 'QL-800', 'QL-810W', 'QL-820NWB',
-            'QL-1050', 'QL-1060N', 'QL-1100', 'QL-1115NWB'
-        ]
+        # Detect available printer libraries
+        self.has_brother_ql = _has_brother_ql()
+        self.has_labelprinterkit = _has_labelprinterkit()
 
-        self.supported_models = self.supported_pt_models + self.supported_ql_models
+        # Reused connections and per-printer send threads for network printers
+        self._tcp_pool = _TCPConnectionPool()
+        self._reset_printer_workers()
 
-        # Detect available printer libraries
-        self.has_brother_ql = self._check_brother_ql()
-        self.has_labelprinterkit = self._check_labelprinterkit()
+        # Last discovery result as (monotonic timestamp, printers)
+        self._discover_cache = None
+        self._discover_lock = threading.Lock()
 
-    def _check_brother_ql(self) -> bool:
-        """Check if brother_ql library is available"""
-        try:
-            import brother_ql
-            return True
-        except ImportError:
-            return False
+        # (text, font_size, margin) -> (size, packed 1-bit raster), least recently used first
+        self._text_raster_cache = OrderedDict()
+        self._text_raster_lock = threading.Lock()
 
-    def _check_labelprinterkit(self) -> bool:
-        """Check if labelprinterkit is available"""
-        try:
-            import labelprinterkit
-            return True
-        except ImportError:
-            return False
+        # Per-thread model -> BrotherQLRaster; an instance accumulates state while converting
+        self._qlr_local = threading.local()
+
+    def reset_after_fork(self):
+        """
+        Drop printer connections and send threads inherited from the parent process
+        Sockets must not be shared with the parent, and threads don't survive fork.
+        """
+        self._tcp_pool.reset()
+        self._reset_printer_workers()
+
+    def _reset_printer_workers(self):
+        """Forget all per-printer send threads"""
+        self._printer_workers: Dict[Tuple[str, int], _PrinterWorker] = {}
+        self._printer_workers_lock = threading.Lock()
+
+    def _get_qlr(self, model: str):
+        """
+        Get this thread's BrotherQLRaster for a model, reset for a new job
+
+        Args:
+            model: Printer model name
+
+        Returns:
+            BrotherQLRaster with an empty instruction buffer
+        """
+        qlr_cache = getattr(self._qlr_local, 'cache', None)
+        if qlr_cache is None:
+            qlr_cache = self._qlr_local.cache = {}
+
+        qlr = qlr_cache.get(model)
+        if qlr is None:
+            _, _, BrotherQLRaster = _load_brother_ql()
+            qlr = qlr_cache[model] = BrotherQLRaster(model)
+        else:
+            # convert() appends to data and only sets these when the model uses them
+            qlr.data = b''
+            qlr.page_number = 0
+            qlr.cut_at_end = True
+            qlr.dpi_600 = False
+            qlr.two_color_printing = False
+            qlr._compression = False
+            qlr.exception_on_warning = False
+        return qlr
+
+    def _send_network(self, identifier: str, data: bytes):
+        """Send instructions through the printer's worker thread and wait until they are written"""
+        key = _parse_tcp_identifier(identifier)
+        worker = self._printer_workers.get(key)
+        if worker is None:
+            with self._printer_workers_lock:
+                worker = self._printer_workers.get(key)
+                if worker is None:
+                    worker = _PrinterWorker(self._tcp_pool, *key)
+                    self._printer_workers[key] = worker
+
+        worker.submit(data).result()
 
     def print_text(
         self,
-        printer: Dict,
+        printer: Union[Dict, PrinterConfig],
         text: str,
         font_size: int = 24,
         rotate: int = 0,
@@ -72,7 +477,7 @@ class BrotherQLHandler:
         Print text on a Brother QL/PT printer
 
         Args:
-            printer: Printer configuration dict
+            printer: Printer configuration dict or PrinterConfig
             text: Text to print
             font_size: Font size in points
             rotate: Rotation angle (0, 90, 180, 270)
@@ -83,20 +488,14 @@ class BrotherQLHandler:
             Dict with success status and optional error message
         """
         try:
-            # Create image from text
-            image = self._text_to_image(text, font_size, margin)
+            # Create 1-bit image from text
+            image = self._get_text_raster(text, font_size, margin)
 
             # Rotate if needed
-            if rotate in [90, 180, 270]:
-                image = image.rotate(rotate, expand=True)
+            image = _rotate(image, rotate)
 
-            # Convert image to base64 for consistency with image printing
-            buffer = io.BytesIO()
-            image.save(buffer, format='PNG')
-            image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-
-            # Use the print_image method
-            return self.print_image(printer, image_base64, rotate=0, cut=cut, margin=0)
+            # Hand the rendered image straight to the shared print path
+            return self._prepare_and_dispatch(image, printer, rotate=0, cut=cut, margin=0)
 
         except Exception as e:
             return {
@@ -106,102 +505,241 @@ class BrotherQLHandler:
 
     def print_image(
         self,
-        printer: Dict,
-        image_base64: str,
+        printer: Union[Dict, PrinterConfig],
+        image_base64: Union[str, bytes, memoryview],
         rotate: int = 0,
         cut: bool = True,
-        margin: int = 10
+        margin: int = 10,
+        dither: bool = True,
+        *,
+        is_base64: bool = True
     ) -> Dict:
         """
         Print an image on a Brother QL/PT/QL printer
 
         Args:
-            printer: Printer configuration dict
-            image_base64: Base64 encoded image
+            printer: Printer configuration dict or PrinterConfig
+            image_base64: Base64 encoded image (str or bytes-like)
             rotate: Rotation angle (0, 90, 180, 270)
             cut: Whether to cut the label after printing
             margin: Margin in pixels
+            dither: Floyd-Steinberg dither when converting to black and white
+            is_base64: Pass False when image_base64 already holds the binary image
+                file (PNG, JPEG, ...); preferred when available, skips the decode pass
 
         Returns:
             Dict with success status and optional error message
         """
         try:
             # Decode base64 image
-            image_data = base64.b64decode(image_base64)
+            image_data = _decode_base64(image_base64) if is_base64 else image_base64
             image = Image.open(io.BytesIO(image_data))
 
-            # Rotate if needed
-            if rotate in [90, 180, 270]:
-                image = image.rotate(rotate, expand=True)
+            return self._prepare_and_dispatch(image, printer, rotate, cut, margin, dither=dither)
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'Failed to print image: {str(e)}',
+                'error_type': 'image_print_error'
+            }
 
-            # Convert to black and white
-            image = image.convert('1')
+    def print_raster(
+        self,
+        printer: Union[Dict, PrinterConfig],
+        raw_1bpp: Union[bytes, bytearray, memoryview],
+        width: int,
+        height: int,
+        rotate: int = 0,
+        cut: bool = True,
+        margin: int = 10
+    ) -> Dict:
+        """
+        Print pre-rendered 1-bit raster data, skipping image decoding and conversion
 
-            # Add margin
-            if margin > 0:
-                image = self._add_margin(image, margin)
+        The layout is PIL's mode '1' raw format: rows top to bottom, each row packed
+        MSB-first (leftmost pixel in the high bit) and padded to a whole byte; a set
+        bit is white, a clear bit is black.
 
-            # Get printer connection details
-            connection = printer.get('connection', 'network')
-            address = printer.get('address')
-            port = printer.get('port', 9100)
-            model = printer.get('model', 'QL-820NWB')
-            label_size = printer.get('label_size', '62')
+        Args:
+            printer: Printer configuration dict or PrinterConfig
+            raw_1bpp: Packed 1-bit pixel rows, ((width + 7) // 8) * height bytes
+            width: Image width in pixels
+            height: Image height in pixels
+            rotate: Rotation angle (0, 90, 180, 270)
+            cut: Whether to cut the label after printing
+            margin: Margin in pixels
 
-            if not address:
+        Returns:
+            Dict with success status and optional error message
+        """
+        try:
+            expected = ((width + 7) // 8) * height
+            if len(raw_1bpp) != expected:
                 return {
                     'success': False,
-                    'error': 'Printer address not specified'
+                    'error': f'Raster data is {len(raw_1bpp)} bytes, expected {expected} for {width}x{height}',
+                    'error_type': 'raster_size_mismatch'
                 }
 
-            # Construct identifier and backend for brother_ql library
-            identifier, backend = self._construct_identifier(connection, address, port)
+            image = Image.frombytes('1', (width, height), raw_1bpp)
+            return self._prepare_and_dispatch(image, printer, rotate, cut, margin)
 
-            # Determine which library to use based on model
-            is_ql_model = any(model.startswith(ql) for ql in ['QL-'])
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'Failed to print raster: {str(e)}',
+                'error_type': 'raster_print_error'
+            }
 
-            if is_ql_model and self.has_brother_ql:
-                return self._print_with_brother_ql(
-                    image, identifier, model, backend, label_size, cut, rotate
-                )
-            elif not is_ql_model and self.has_labelprinterkit:
-                return self._print_with_labelprinterkit(
-                    image, identifier, model, backend, cut
-                )
-            else:
-                # Fallback to raw ESC/P commands
-                return self._print_raw(image, identifier, model, backend, cut)
+    def _prepare_and_dispatch(
+        self,
+        image: Image.Image,
+        printer: Union[Dict, PrinterConfig],
+        rotate: int,
+        cut: bool,
+        margin: int,
+        threshold: Optional[float] = None,
+        dither: bool = True
+    ) -> Dict:
+        """
+        Prepare a PIL image for printing and send it to the right backend
 
-        except Exception as e:
+        Args:
+            image: PIL Image to print
+            printer: Printer configuration dict or PrinterConfig
+            rotate: Rotation angle (0, 90, 180, 270)
+            cut: Whether to cut the label after printing
+            margin: Margin in pixels
+            threshold: Black threshold in percent; takes precedence over dither
+            dither: Floyd-Steinberg dither when no threshold is given
+
+        Returns:
+            Dict with success status and optional error message
+        """
+        # Rotate if needed
+        image = _rotate(image, rotate)
+
+        # Convert to black and white
+        image = _to_monochrome(image, threshold, dither)
+
+        # Add margin
+        if margin > 0:
+            image = self._add_margin(image, margin)
+
+        return self._dispatch(image, PrinterConfig.from_printer(printer), cut, rotate)
+
+    def _dispatch(self, image: Image.Image, config: PrinterConfig, cut: bool, rotate: int) -> Dict:
+        """
+        Send a prepared 1-bit image to the backend matching the printer model
+
+        Args:
+            image: PIL Image, already rotated, converted and padded
+            config: Printer connection details
+            cut: Whether to cut the label after printing
+            rotate: Rotation angle passed on to brother_ql
+
+        Returns:
+            Dict with success status and optional error message
+        """
+        send_image = self._select_backend(config)
+        if send_image is None:
             return {
                 'success': False,
-                'error': f'Failed to print image: {str(e)}',
-                'error_type': 'image_print_error'
+                'error': 'Printer address not specified'
             }
+        return send_image(image, cut, rotate)
+
+    def _select_backend(self, config: PrinterConfig) -> Optional[Callable[[Image.Image, bool, int], Dict]]:
+        """
+        Resolve the printer's identifier and backend once, for jobs with several images
+
+        Args:
+            config: Printer connection details
+
+        Returns:
+            Callable taking (image, cut, rotate), or None if no address is configured
+        """
+        if not config.address:
+            return None
+
+        # Construct identifier and backend for brother_ql library
+        identifier, backend = self._construct_identifier(config.connection, config.address, config.port)
+        model = config.model
+        label_size = config.label_size
+
+        # Determine which library to use based on model
+        is_ql_model = model.startswith(QL_PREFIXES)
+
+        if is_ql_model and self.has_brother_ql:
+            return lambda image, cut, rotate: self._print_with_brother_ql(
+                [image], identifier, model, backend, label_size, cut, rotate
+            )
+        elif not is_ql_model and self.has_labelprinterkit:
+            return lambda image, cut, rotate: self._print_with_labelprinterkit(
+                image, identifier, model, backend, cut
+            )
+        else:
+            # Fallback to raw ESC/P commands
+            return lambda image, cut, rotate: self._print_raw(image, identifier, model, backend, cut)
+
+    def _select_batch_backend(
+        self,
+        config: PrinterConfig
+    ) -> Optional[Tuple[Callable[[List[Image.Image], bool, int], Dict], int]]:
+        """
+        Like _select_backend, for jobs that can send several images in one go
+
+        Args:
+            config: Printer connection details
+
+        Returns:
+            (callable taking (images, cut, rotate), max images per call), or None
+            if no address is configured
+        """
+        print_image = self._select_backend(config)
+        if print_image is None:
+            return None
+
+        if config.model.startswith(QL_PREFIXES) and self.has_brother_ql:
+            # brother_ql converts a list of images into a single instruction stream
+            identifier, backend = self._construct_identifier(config.connection, config.address, config.port)
+            return (
+                lambda images, cut, rotate: self._print_with_brother_ql(
+                    images, identifier, config.model, backend, config.label_size, cut, rotate
+                ),
+                PDF_BATCH_PAGES
+            )
+
+        return lambda images, cut, rotate: print_image(images[0], cut, rotate), 1
 
     def print_pdf(
         self,
-        printer: Dict,
-        pdf_base64: str,
+        printer: Union[Dict, PrinterConfig],
+        pdf_base64: Union[str, bytes, memoryview],
         rotate: int = 0,
         cut: bool = True,
         margin: int = 10,
-        dpi: int = 300
+        dpi: Optional[int] = None,
+        dither: bool = True
     ) -> Dict:
         """
         Print a PDF on a Brother QL/PT printer
         Each page of the PDF will be printed as a separate label
 
         Args:
-            printer: Printer configuration dict
-            pdf_base64: Base64 encoded PDF data
+            printer: Printer configuration dict or PrinterConfig
+            pdf_base64: Base64 encoded PDF data (str or bytes-like)
             rotate: Rotation angle (0, 90, 180, 270)
             cut: Whether to cut the label after printing each page
             margin: Margin in pixels
-            dpi: DPI for PDF to image conversion (default: 300)
+            dpi: DPI for PDF to image conversion; defaults to and is capped at the
+                model's print head resolution (300 for QL, 180 for PT)
+            dither: Floyd-Steinberg dither pages when converting to black and white
 
         Returns:
-            Dict with success status, pages printed count, and optional error message
+            Dict with success status, pages printed count, per-page render
+            times (page_render_ms) and optional error message
         """
         if not PDF_SUPPORT:
             return {
@@ -211,8 +749,15 @@ class BrotherQLHandler:
             }
 
         try:
+            # Get printer connection details
+            config = PrinterConfig.from_printer(printer)
+
+            # Rendering above the head resolution is always wasted work
+            head_dpi = max_dpi_for_model(config.model)
+            dpi = head_dpi if dpi is None else min(dpi, head_dpi)
+
             # Decode base64 PDF
-            pdf_data = base64.b64decode(pdf_base64)
+            pdf_data = _decode_base64(pdf_base64)
 
             # Open PDF with PyMuPDF
             pdf_document = fitz.open(stream=pdf_data, filetype="pdf")
@@ -229,88 +774,85 @@ class BrotherQLHandler:
             results = []
             successful_pages = 0
             failed_pages = 0
+            render_times_ms = []
+
+            batch_backend = self._select_batch_backend(config)
+            if batch_backend is None:
+                # Nothing can be printed, so don't render any pages
+                results = [
+                    {'page': page_num + 1, 'success': False, 'error': 'Printer address not specified'}
+                    for page_num in range(page_count)
+                ]
+                failed_pages = page_count
+            else:
+                print_pages, batch_size = batch_backend
 
-            # Process each page
-            for page_num in range(page_count):
-                try:
-                    # Get the page
-                    page = pdf_document[page_num]
-
-                    # Convert page to image (pixmap)
-                    # zoom factor determines DPI: 1.0 = 72 DPI, 4.167 = 300 DPI
-                    zoom = dpi / 72.0
-                    mat = fitz.Matrix(zoom, zoom)
-                    pix = page.get_pixmap(matrix=mat)
-
-                    # Convert pixmap to PIL Image
-                    img_data = pix.tobytes("png")
-                    image = Image.open(io.BytesIO(img_data))
-
-                    # Rotate if needed
-                    if rotate in [90, 180, 270]:
-                        image = image.rotate(rotate, expand=True)
-
-                    # Convert to black and white
-                    image = image.convert('1')
-
-                    # Add margin
-                    if margin > 0:
-                        image = self._add_margin(image, margin)
-
-                    # Get printer connection details
-                    connection = printer.get('connection', 'network')
-                    address = printer.get('address')
-                    port = printer.get('port', 9100)
-                    model = printer.get('model', 'QL-820NWB')
-                    label_size = printer.get('label_size', '62')
-
-                    if not address:
+                # Rendered pages waiting to be sent: (page number, image)
+                batch = []
+
+                def send_batch():
+                    nonlocal successful_pages, failed_pages
+                    batch_result = print_pages([image for _, image in batch], cut, rotate)
+
+                    # A batch goes out as one instruction stream, so its pages share a
+                    # result. Only a failed conversion is retried page by page, so each
+                    # page reports its own outcome; after a failed send part of the batch
+                    # may already have printed, and a dead printer would just time out again
+                    if batch_result.get('error_type') != 'conversion_error' or len(batch) == 1:
+                        page_results = [(batch_page, batch_result) for batch_page, _ in batch]
+                    else:
+                        page_results = [
+                            (batch_page, print_pages([image], cut, rotate))
+                            for batch_page, image in batch
+                        ]
+
+                    for batch_page, page_result in page_results:
                         results.append({
-                            'page': page_num + 1,
-                            'success': False,
-                            'error': 'Printer address not specified'
+                            'page': batch_page + 1,
+                            'success': page_result['success'],
+                            'error': page_result.get('error') if not page_result['success'] else None
                         })
-                        failed_pages += 1
-                        continue
-
-                    # Construct identifier and backend for brother_ql library
-                    identifier, backend = self._construct_identifier(connection, address, port)
-
-                    # Determine which library to use based on model
-                    is_ql_model = any(model.startswith(ql) for ql in ['QL-'])
-
-                    # Print the page
-                    if is_ql_model and self.has_brother_ql:
-                        page_result = self._print_with_brother_ql(
-                            image, identifier, model, backend, label_size, cut, rotate
-                        )
-                    elif not is_ql_model and self.has_labelprinterkit:
-                        page_result = self._print_with_labelprinterkit(
-                            image, identifier, model, backend, cut
-                        )
-                    else:
-                        # Fallback to raw ESC/P commands
-                        page_result = self._print_raw(image, identifier, model, backend, cut)
-
-                    # Track result for this page
-                    results.append({
-                        'page': page_num + 1,
-                        'success': page_result['success'],
-                        'error': page_result.get('error') if not page_result['success'] else None
-                    })
-
-                    if page_result['success']:
-                        successful_pages += 1
-                    else:
-                        failed_pages += 1
 
-                except Exception as e:
-                    results.append({
-                        'page': page_num + 1,
-                        'success': False,
-                        'error': str(e)
-                    })
-                    failed_pages += 1
+                        if page_result['success']:
+                            successful_pages += 1
+                        else:
+                            failed_pages += 1
+                    batch.clear()
+
+                # Render the next page on a background thread while the current one
+                # is being sent. A single render thread keeps PyMuPDF document access
+                # single-threaded and limits look-ahead to one page.
+                with ThreadPoolExecutor(max_workers=1) as render_pool:
+                    next_render = render_pool.submit(
+                        self._render_pdf_page, pdf_document, 0, dpi, rotate, margin, dither
+                    )
+
+                    # Process each page
+                    for page_num in range(page_count):
+                        render = next_render
+                        if page_num + 1 < page_count:
+                            next_render = render_pool.submit(
+                                self._render_pdf_page, pdf_document, page_num + 1, dpi, rotate, margin, dither
+                            )
+
+                        try:
+                            image, render_ms = render.result()
+                            render_times_ms.append(render_ms)
+                            batch.append((page_num, image))
+
+                        except Exception as e:
+                            results.append({
+                                'page': page_num + 1,
+                                'success': False,
+                                'error': str(e)
+                            })
+                            failed_pages += 1
+
+                        # Print the pages rendered so far
+                        if batch and (len(batch) == batch_size or page_num + 1 == page_count):
+                            send_batch()
+
+                results.sort(key=lambda result: result['page'])
 
             # Close PDF
             pdf_document.close()
@@ -323,6 +865,7 @@ class BrotherQLHandler:
                 'pages_successful': successful_pages,
                 'pages_failed': failed_pages,
                 'page_results': results,
+                'page_render_ms': render_times_ms,
                 'error': None if all_success else f'{failed_pages} of {page_count} pages failed to print',
                 'error_type': None if all_success else 'partial_pdf_print_failure'
             }
@@ -334,9 +877,77 @@ class BrotherQLHandler:
                 'error_type': 'pdf_processing_error'
             }
 
+    def _render_pdf_page(
+        self,
+        pdf_document,
+        page_num: int,
+        dpi: int,
+        rotate: int,
+        margin: int,
+        dither: bool = True
+    ) -> tuple:
+        """
+        Render a PDF page to a black and white label image
+
+        Returns:
+            Tuple of (image, render duration in milliseconds)
+        """
+        start_ns = time.perf_counter_ns()
+
+        # Get the page
+        page = pdf_document[page_num]
+
+        # Convert page to image (pixmap)
+        # zoom factor determines DPI: 1.0 = 72 DPI, 4.167 = 300 DPI
+        zoom = dpi / 72.0
+        mat = fitz.Matrix(zoom, zoom)
+        image = self._render_pdf_pixmap(page, mat)
+
+        # Rotate if needed
+        image = _rotate(image, rotate)
+
+        # Convert to black and white
+        image = _to_monochrome(image, dither=dither)
+
+        # Add margin
+        if margin > 0:
+            image = self._add_margin(image, margin)
+
+        return image, (time.perf_counter_ns() - start_ns) / 1_000_000
+
+    def _render_pdf_pixmap(self, page, mat) -> Image.Image:
+        """
+        Rasterize a PDF page to a grayscale PIL image
+        Colour is dropped at render time since the label is printed in black and white anyway.
+        Pages whose pixmap would exceed PDF_STRIP_THRESHOLD are rendered in horizontal strips
+        into one canvas, so peak memory stays near the size of the final image.
+        """
+        bounds = (page.rect * mat).irect
+        width, height = bounds.width, bounds.height
+
+        if width * height <= PDF_STRIP_THRESHOLD:
+            pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+            # Wrap the raw pixmap samples directly, no PNG encode/decode
+            return Image.frombytes('L', (pix.width, pix.height), pix.samples_mv)
+
+        # Parse the page content once and replay it for each strip
+        display_list = page.get_displaylist()
+        strip_height = max(1, PDF_STRIP_BYTES // width)
+        zoom_y = mat.d
+        rect = page.rect
+
+        canvas = Image.new('L', (width, height), color=255)
+        for top in range(0, height, strip_height):
+            bottom = min(top + strip_height, height)
+            clip = fitz.Rect(rect.x0, rect.y0 + top / zoom_y, rect.x1, rect.y0 + bottom / zoom_y)
+            pix = display_list.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False, clip=clip)
+            canvas.paste(Image.frombytes('L', (pix.width, pix.height), pix.samples_mv), (0, top))
+
+        return canvas
+
     def _print_with_brother_ql(
         self,
-        image: Image.Image,
+        images: List[Image.Image],
         identifier: str,
         model: str,
         backend: str,
@@ -344,20 +955,18 @@ class BrotherQLHandler:
         cut: bool,
         rotate: int
     ) -> Dict:
-        """Print using the brother_ql library"""
+        """Print using the brother_ql library; all images go out as one instruction stream"""
         try:
-            from brother_ql.conversion import convert
-            from brother_ql.backends.helpers import send
-            from brother_ql.raster import BrotherQLRaster
+            convert, send, _ = _load_brother_ql()
 
             # Create raster instructions
-            qlr = BrotherQLRaster(model)
+            qlr = self._get_qlr(model)
             instructions = convert(
                 qlr=qlr,
-                images=[image],
+                images=images,
                 label=label_size,
                 rotate='auto' if rotate == 0 else str(rotate),
-                threshold=70.0,
+                threshold=BLACK_THRESHOLD,
                 dither=False,
                 compress=False,
                 red=False,
@@ -366,13 +975,25 @@ class BrotherQLHandler:
                 cut=cut
             )
 
-            # Send to printer
-            send(
-                instructions=instructions,
-                printer_identifier=identifier,
-                backend_identifier=backend,
-                blocking=True
-            )
+        except Exception as e:
+            # Nothing reached the printer, so the images can safely be retried separately
+            return {
+                'success': False,
+                'error': f'brother_ql print failed: {str(e)}',
+                'error_type': 'conversion_error'
+            }
+
+        try:
+            # Send to printer; the network backend has no read-back, so a pooled write is equivalent
+            if backend == 'network':
+                self._send_network(identifier, instructions)
+            else:
+                send(
+                    instructions=instructions,
+                    printer_identifier=identifier,
+                    backend_identifier=backend,
+                    blocking=True
+                )
 
             return {
                 'success': True,
@@ -382,7 +1003,8 @@ class BrotherQLHandler:
         except Exception as e:
             return {
                 'success': False,
-                'error': f'brother_ql print failed: {str(e)}'
+                'error': f'brother_ql print failed: {str(e)}',
+                'error_type': 'send_error'
             }
 
     def _print_with_labelprinterkit(
@@ -428,13 +1050,7 @@ class BrotherQLHandler:
                 }
 
             # Extract host and port
-            host_port = identifier.replace('tcp://', '')
-            if ':' in host_port:
-                host, port = host_port.rsplit(':', 1)
-                port = int(port)
-            else:
-                host = host_port
-                port = 9100  # Default Brother printer port
+            host, port = _parse_tcp_identifier(identifier)
 
             # Convert image to raster data
             width, height = image.size
@@ -473,32 +1089,32 @@ class BrotherQLHandler:
         Returns:
             Tuple of (identifier, backend) for brother_ql library
         """
-        if connection == 'network':
-            if port:
-                identifier = f"tcp://{address}:{port}"
-            else:
-                identifier = f"tcp://{address}"
-            backend = 'network'
-        elif connection == 'usb':
-            identifier = f"usb://{address}"
-            backend = 'pyusb'
-        elif connection == 'serial':
-            identifier = f"file://{address}"
-            backend = 'linux_kernel'
-        else:
-            # Unknown connection type, treat as network
-            identifier = f"tcp://{address}"
-            backend = 'network'
-
-        return identifier, backend
+        return _construct_identifier(connection, address, port)
 
-    def discover_printers(self) -> List[Dict]:
+    def discover_printers(self, force: bool = False) -> List[Dict]:
         """
         Discover Brother QL/PT/QL printers on the network
+        Results are cached for DISCOVERY_CACHE_TTL seconds since discovery waits on broadcast replies
+
+        Args:
+            force: Run discovery again even if a cached result is available
 
         Returns:
             List of discovered printers with their details
         """
+        # Held while discovering, so concurrent callers share one broadcast
+        with self._discover_lock:
+            if not force and self._discover_cache is not None:
+                cached_at, cached = self._discover_cache
+                if time.monotonic() - cached_at < DISCOVERY_CACHE_TTL:
+                    return list(cached)
+
+            discovered = self._discover_printers()
+            self._discover_cache = (time.monotonic(), discovered)
+            return list(discovered)
+
+    def _discover_printers(self) -> List[Dict]:
+        """Run network discovery via brother_ql"""
         discovered = []
 
         try:
@@ -522,34 +1138,38 @@ class BrotherQLHandler:
 
         return discovered
 
-    def _text_to_image(self, text: str, font_size: int, margin: int) -> Image.Image:
-        """Convert text to an image"""
-        # Try to use a nice font, fallback to default
-        try:
-            # Try common font locations
-            font_paths = [
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-                "C:\\Windows\\Fonts\\arial.ttf",
-                "/System/Library/Fonts/Helvetica.ttc"
-            ]
-
-            font = None
-            for path in font_paths:
-                if os.path.exists(path):
-                    font = ImageFont.truetype(path, font_size)
-                    break
+    def _get_text_raster(self, text: str, font_size: int, margin: int) -> Image.Image:
+        """Return the 1-bit label for this text, reusing recent renders"""
+        key = (text, font_size, margin)
+        with self._text_raster_lock:
+            entry = self._text_raster_cache.get(key)
+            if entry is not None:
+                self._text_raster_cache.move_to_end(key)
+        if entry is not None:
+            size, raster = entry
+            return Image.frombytes('1', size, raster)
+
+        # Rendered text is pure black on white apart from antialiased edges, so threshold rather than dither
+        image = _to_monochrome(self._text_to_image(text, font_size, margin), BLACK_THRESHOLD)
+
+        # Packed rows are 8x smaller than the grayscale render and rebuild into a fresh image on every hit
+        with self._text_raster_lock:
+            self._text_raster_cache[key] = (image.size, image.tobytes())
+            self._text_raster_cache.move_to_end(key)
+            while len(self._text_raster_cache) > TEXT_RASTER_CACHE_SIZE:
+                self._text_raster_cache.popitem(last=False)
 
-            if font is None:
-                font = ImageFont.load_default()
-        except:
-            font = ImageFont.load_default()
+        return image
 
-        # Create a temporary image to calculate text size
-        temp_img = Image.new('RGB', (1, 1), color='white')
-        temp_draw = ImageDraw.Draw(temp_img)
+    def _text_to_image(self, text: str, font_size: int, margin: int) -> Image.Image:
+        """Convert text to a grayscale image (black text, antialiased edges)"""
+        font = _load_font(font_size)
 
-        # Get text bounding box
-        bbox = temp_draw.textbbox((0, 0), text, font=font)
+        # Get text bounding box; getbbox needs no scratch image but only handles one line
+        if '\n' in text:
+            bbox = _MEASURE_DRAW.multiline_textbbox((0, 0), text, font=font)
+        else:
+            bbox = font.getbbox(text)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
 
@@ -557,20 +1177,15 @@ class BrotherQLHandler:
         img_width = text_width + (margin * 2)
         img_height = text_height + (margin * 2)
 
-        image = Image.new('RGB', (img_width, img_height), color='white')
+        # Black on white needs no color channels; an 'L' canvas is a third the size of RGB
+        image = Image.new('L', (img_width, img_height), color=255)
         draw = ImageDraw.Draw(image)
 
         # Draw text centered
-        draw.text((margin, margin), text, fill='black', font=font)
+        draw.text((margin, margin), text, fill=0, font=font)
 
         return image
 
     def _add_margin(self, image: Image.Image, margin: int) -> Image.Image:
         """Add white margin around an image"""
-        new_width = image.width + (margin * 2)
-        new_height = image.height + (margin * 2)
-
-        new_image = Image.new('1', (new_width, new_height), color=1)  # 1 = white in binary
-        new_image.paste(image, (margin, margin))
-
-        return new_image
+        return ImageOps.expand(image, border=margin, fill=1)  # 1 = white in binary
@@ -0,0 +1,54 @@
+"""
+Gunicorn configuration for the Brother Label API
+Usage: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import gc
+import os
+import sys
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Threaded workers suit the workload: mostly blocking I/O to printers
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+threads = int(os.getenv('GUNICORN_THREADS', '5'))
+
+# Import the app (config, printer handler, telemetry) once in the master before forking
+preload_app = True
+
+keepalive = 5
+
+# Recycle workers periodically to bound memory growth
+max_requests = 1000
+max_requests_jitter = 100
+
+accesslog = '-'
+
+
+def pre_fork(server, worker):
+    """
+    Move preloaded objects out of the GC's generations so collections in
+    workers don't write to (and un-share) their copy-on-write pages
+    """
+    gc.freeze()
+
+
+def when_ready(server):
+    """
+    The master only loaded the app and serves no requests; its telemetry would
+    export under the same resource as the workers, so stop it before forking
+    """
+    app_module = sys.modules.get('app')
+    if app_module is not None:
+        app_module.stop_master_telemetry()
+
+
+def post_fork(server, worker):
+    """
+    Preloaded connections, threads and the telemetry exporter belong to the
+    master; give each worker its own
+    """
+    app_module = sys.modules.get('app')
+    if app_module is not None:
+        app_module.reinit_after_fork()
@@ -3,9 +3,26 @@ Printer configuration manager
 Handles loading printers from config and API key validation
 """
 
+import hashlib
 import json
 import os
-from typing import Dict, List, Optional
+import orjson
+import tempfile
+from typing import Callable, Dict, List, Optional
+
+# Secret for API key digests; only compared within this process (and its forked workers)
+_API_KEY_HASH_KEY = os.urandom(16)
+
+
+def _read_umask() -> int:
+    """Process umask; os.umask() can only read it by setting it, so this runs once at import"""
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# Mode bits removed from newly created files, as open() would apply them
+_UMASK = _read_umask()
 
 
 class PrinterManager:
@@ -15,6 +32,9 @@ class PrinterManager:
         self.config_file = config_file
         self.config = self._load_config()
         self._api_key_map = self._build_api_key_map()
+        self._api_key_digests = self._build_api_key_digests()
+        self._build_printer_caches()
+        self._change_callbacks: List[Callable[[], None]] = []
 
     def _load_config(self) -> Dict:
         """Load configuration from JSON file"""
@@ -29,8 +49,7 @@ class PrinterManager:
                 ],
                 "printers": []
             }
-            with open(self.config_file, 'w') as f:
-                json.dump(default_config, f, indent=2)
+            self._write_config(default_config)
             return default_config
 
         with open(self.config_file, 'r') as f:
@@ -54,30 +73,88 @@ class PrinterManager:
 
         return key_map
 
+    @staticmethod
+    def hash_api_key(api_key: str) -> bytes:
+        """
+        Digest used to look up API keys without comparing raw key strings
+        Keyed with a per-process secret, so lookup timing says nothing about valid keys
+        """
+        return hashlib.blake2b(api_key.encode(), digest_size=16, key=_API_KEY_HASH_KEY).digest()
+
+    def _build_api_key_digests(self) -> Dict[bytes, str]:
+        """Build a map of API key digests to their names"""
+        return {self.hash_api_key(key): name for key, name in self._api_key_map.items()}
+
+    def register_change_callback(self, callback: Callable[[], None]):
+        """Register a callback invoked whenever the printer configuration changes"""
+        self._change_callbacks.append(callback)
+
+    def _notify_change(self):
+        """Rebuild derived caches and invoke all registered change callbacks"""
+        self._build_printer_caches()
+        for callback in self._change_callbacks:
+            callback()
+
+    def _build_printer_caches(self):
+        """
+        Index printers by ID and name, and pre-serialize API responses for the
+        printer list and each printer
+        """
+        printers = self.config.get('printers', [])
+        self._printers_json = orjson.dumps({'printers': printers})
+
+        printer_index = {}
+        printer_json = {}
+        for printer in printers:
+            body = orjson.dumps({'printer': printer})
+            # First match in list order wins
+            for key in (printer.get('id'), printer.get('name')):
+                if key is not None:
+                    printer_index.setdefault(key, printer)
+                    printer_json.setdefault(key, body)
+        self._printer_index = printer_index
+        self._printer_json_cache = printer_json
+
     def validate_api_key(self, api_key: str) -> bool:
         """Validate if the provided API key is authorized"""
-        return api_key in self._api_key_map
+        return self.hash_api_key(api_key) in self._api_key_digests
 
     def get_api_key_name(self, api_key: str) -> Optional[str]:
         """
         Get the name/alias for an API key
         Returns None if key has no name or is invalid
         """
-        return self._api_key_map.get(api_key)
+        return self._api_key_digests.get(self.hash_api_key(api_key))
+
+    def get_api_key_name_by_digest(self, digest: bytes) -> Optional[str]:
+        """
+        Get the name/alias for an API key digest (from hash_api_key)
+        Validates and resolves the key with a single lookup; None if invalid
+        """
+        return self._api_key_digests.get(digest)
 
     def get_all_printers(self) -> List[Dict]:
         """Get all configured printers"""
         return self.config.get('printers', [])
 
-    def get_printer(self, printer_id: str) -> Optional[Dict]:
-        """Get a specific printer by ID or name"""
-        printers = self.config.get('printers', [])
+    def get_all_printers_json(self) -> bytes:
+        """Get the serialized {"printers": [...]} response body"""
+        return self._printers_json
 
-        for printer in printers:
-            if printer.get('id') == printer_id or printer.get('name') == printer_id:
-                return printer
+    def get_printer_json(self, printer_id: str) -> Optional[bytes]:
+        """Get the serialized {"printer": {...}} response body by ID or name"""
+        # IDs can come from request JSON, so e.g. a list must be "not found", not a TypeError
+        try:
+            return self._printer_json_cache.get(printer_id)
+        except TypeError:
+            return None
 
-        return None
+    def get_printer(self, printer_id: str) -> Optional[Dict]:
+        """Get a specific printer by ID or name"""
+        try:
+            return self._printer_index.get(printer_id)
+        except TypeError:
+            return None
 
     def add_printer(self, printer: Dict) -> bool:
         """Add a new printer to configuration"""
@@ -90,6 +167,7 @@ class PrinterManager:
 
         self.config['printers'].append(printer)
         self._save_config()
+        self._notify_change()
         return True
 
     def remove_printer(self, printer_id: str) -> bool:
@@ -104,11 +182,49 @@ class PrinterManager:
 
         if len(self.config['printers']) < original_length:
             self._save_config()
+            self._notify_change()
             return True
 
         return False
 
     def _save_config(self):
         """Save configuration to file"""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.config, f, indent=2)
+        self._write_config(self.config)
+
+    def _write_config(self, config: Dict):
+        """
+        Atomically write configuration to file
+        Written to a temporary file first, so a crash never leaves a truncated config
+        """
+        # A unique temporary file in the same directory, so concurrent writers never
+        # share it and os.replace() stays on one filesystem
+        fd, tmp_file = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(self.config_file)),
+            prefix=f'.{os.path.basename(self.config_file)}.',
+            suffix='.tmp'
+        )
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+                f.flush()
+                os.fsync(f.fileno())
+            # Keep the existing file's permissions and owner rather than mkstemp's 0600;
+            # a new file gets the umask-based mode open() would have created it with
+            try:
+                st = os.stat(self.config_file)
+            except FileNotFoundError:
+                os.chmod(tmp_file, 0o666 & ~_UMASK)
+            else:
+                os.chmod(tmp_file, st.st_mode & 0o7777)
+                if hasattr(os, 'chown'):
+                    try:
+                        os.chown(tmp_file, st.st_uid, st.st_gid)
+                    except PermissionError:
+                        pass
+            os.replace(tmp_file, self.config_file)
+        except BaseException:
+            try:
+                os.unlink(tmp_file)
+            except FileNotFoundError:
+                pass
+            raise
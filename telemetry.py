@@ -3,294 +3,752 @@ OpenTelemetry metrics configuration and instrumentation
 Exports metrics via OTLP HTTP to configured endpoint (e.g., Grafana Cloud)
 """
 
+import atexit
 import os
+import queue
+import re
+import socket
+import threading
 import time
-from typing import Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any, Mapping, Iterable, FrozenSet
+from collections import deque
 from contextlib import contextmanager
+from functools import lru_cache
+from urllib.parse import unquote
 
+import requests
+from requests.adapters import HTTPAdapter
 from opentelemetry import metrics
 from opentelemetry.sdk.metrics import MeterProvider
-from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+from opentelemetry.sdk.metrics.export import MetricExportResult, PeriodicExportingMetricReader
+from opentelemetry.exporter.otlp.proto.http import Compression
 from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
 from opentelemetry.sdk.resources import Resource
 
 
+# Environment variables read by TelemetryManager, with their defaults
+_ENV_DEFAULTS = {
+    'OTEL_ENABLED': 'false',
+    'OTEL_EXPORTER_OTLP_ENDPOINT': '',
+    'OTEL_EXPORTER_OTLP_HEADERS': '',
+    'OTEL_EXPORTER_OTLP_COMPRESSION': 'gzip',
+    'OTEL_SERVICE_NAME': 'brother-label-api',
+    'OTEL_ENVIRONMENT': 'production',
+    'OTEL_EXPORT_INTERVAL_MS': '60000',
+    'OTEL_EXPORT_TIMEOUT_MS': '10000',
+    'OTEL_EXPORT_QUEUE_SIZE': '64',
+    'OTEL_METRIC_DISABLED': '',
+}
+
+
+# Commas that start a new "key=" pair; other commas belong to the previous value
+_HEADER_SEPARATOR = re.compile(r',(?=\s*[^,=\s]+\s*=)')
+
+
+def _parse_headers(headers: str) -> Dict[str, str]:
+    """
+    Parse OTEL_EXPORTER_OTLP_HEADERS ("key1=value1,key2=value2")
+    Values are percent-decoded as the OTLP spec requires (e.g. "Basic%20...");
+    an unencoded comma inside a value is kept rather than splitting the value.
+    """
+    headers_dict = {}
+    for header in _HEADER_SEPARATOR.split(headers):
+        key, sep, value = header.partition('=')
+        key = key.strip()
+        if sep and key:
+            headers_dict[key] = unquote(value.strip())
+    return headers_dict
+
+
+# (attribute, instrument kind, name, description, unit) for every instrument
+_INSTRUMENTS = (
+    # === COUNTERS ===
+    ('api_requests_counter', 'counter', "api.requests.total", "Total number of API requests", "1"),
+    ('prints_total_counter', 'counter', "prints.total", "Total number of print jobs attempted", "1"),
+    ('prints_success_counter', 'counter', "prints.success", "Total number of successful print jobs", "1"),
+    ('prints_failed_counter', 'counter', "prints.failed", "Total number of failed print jobs", "1"),
+    ('errors_counter', 'counter', "errors.total", "Total number of errors by type", "1"),
+    ('telemetry_dropped_counter', 'counter', "telemetry.dropped",
+     "Telemetry events dropped because the recording queue was full", "1"),
+
+    # === HISTOGRAMS ===
+    ('http_request_duration', 'histogram', "http.request.duration",
+     "HTTP request duration in milliseconds", "ms"),
+    ('print_duration', 'histogram', "print.duration", "Print job duration in milliseconds", "ms"),
+    ('image_generation_duration', 'histogram', "image.generation.duration",
+     "Image generation duration in milliseconds", "ms"),
+    ('printer_response_time', 'histogram', "printer.response.time", "Printer response time in milliseconds", "ms"),
+
+    # === GAUGES ===
+    ('printers_configured_gauge', 'up_down_counter', "printers.configured", "Number of configured printers", "1"),
+    ('api_keys_configured_gauge', 'up_down_counter', "api_keys.configured", "Number of configured API keys", "1"),
+)
+
+
+def _parse_compression(value: str) -> Compression:
+    """
+    Parse OTEL_EXPORTER_OTLP_COMPRESSION
+    Empty means no compression; an unsupported value (e.g. "snappy") warns and
+    falls back to gzip rather than stopping the app from starting.
+    """
+    value = value.strip().lower()
+    if not value:
+        return Compression.NoCompression
+    try:
+        return Compression(value)
+    except ValueError:
+        print(f"Warning: unsupported OTEL_EXPORTER_OTLP_COMPRESSION={value!r}, using gzip.")
+        return Compression.Gzip
+
+
+def _noop(*args, **kwargs):
+    """Stands in for every recorder when telemetry is disabled"""
+
+
+# Recorded in place of attribute values outside the configured set
+OTHER_ATTRIBUTE_VALUE = "other"
+
+
+@lru_cache(maxsize=512)
+def http_attributes(endpoint: str, method: str, status_code: int) -> Dict[str, Any]:
+    """Shared attribute dict for HTTP request metrics (do not mutate)"""
+    return {
+        "endpoint": endpoint,
+        "method": method,
+        "status_code": status_code,
+    }
+
+
+@lru_cache(maxsize=512)
+def api_request_attributes(endpoint: str, method: str, status_code: int,
+                           api_key_name: Optional[str] = None) -> Dict[str, Any]:
+    """Shared attribute dict for the API request counter (do not mutate)"""
+    attributes = dict(http_attributes(endpoint, method, status_code))
+    if api_key_name:
+        attributes["api_key_name"] = api_key_name
+    return attributes
+
+
+@lru_cache(maxsize=512)
+def print_attributes(printer_id: str, printer_model: str, label_type: str,
+                     api_key_name: Optional[str] = None) -> Dict[str, Any]:
+    """Shared attribute dict for the print attempt/success counters (do not mutate)"""
+    attributes = {
+        "printer_id": printer_id,
+        "printer_model": printer_model,
+        "label_type": label_type,
+    }
+    if api_key_name:
+        attributes["api_key_name"] = api_key_name
+    return attributes
+
+
+@lru_cache(maxsize=512)
+def print_failure_attributes(printer_id: str, printer_model: str, error_type: str,
+                             api_key_name: Optional[str] = None) -> Dict[str, Any]:
+    """Shared attribute dict for the print failure counter (do not mutate)"""
+    attributes = {
+        "printer_id": printer_id,
+        "printer_model": printer_model,
+        "error_type": error_type,
+    }
+    if api_key_name:
+        attributes["api_key_name"] = api_key_name
+    return attributes
+
+
+@lru_cache(maxsize=512)
+def print_duration_attributes(printer_id: str, printer_model: str, result: str) -> Dict[str, Any]:
+    """Shared attribute dict for the print duration histogram (do not mutate)"""
+    return {
+        "printer_id": printer_id,
+        "printer_model": printer_model,
+        "result": result,
+    }
+
+
+@lru_cache(maxsize=512)
+def error_attributes(error_type: str, endpoint: str,
+                     api_key_name: Optional[str] = None) -> Dict[str, Any]:
+    """Shared attribute dict for the error counter (do not mutate)"""
+    attributes = {
+        "error_type": error_type,
+        "endpoint": endpoint,
+    }
+    if api_key_name:
+        attributes["api_key_name"] = api_key_name
+    return attributes
+
+
+def _export_session() -> requests.Session:
+    """
+    HTTP session for OTLP exports
+    Exports come from one thread, so a single kept-alive connection per host
+    reuses TCP and TLS across batches; the exporter does its own retries.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class _AsyncOTLPMetricExporter(OTLPMetricExporter):
+    """
+    OTLP exporter that sends batches from its own thread
+    export() only enqueues, so a slow or unreachable collector never holds up the
+    metric reader's collection cycle. When the queue is full the batch is dropped,
+    counted and reported at most once per DROP_WARNING_INTERVAL seconds; with
+    cumulative temporality the next batch carries the totals.
+    """
+
+    _STOP = object()
+    DROP_WARNING_INTERVAL = 60.0
+
+    def __init__(self, *args, queue_size: int = 64, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queue_size = queue_size
+        self.dropped_batches = 0
+        self._drop_warned_at = None
+        self._discarded = False
+
+        self._start()
+
+    def _start(self):
+        """Create the queue and its export thread"""
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._thread = threading.Thread(target=self._run, name='otlp-export', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """Send queued batches with the regular OTLP exporter"""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is self._STOP:
+                    return
+
+                metrics_data, timeout_millis = item
+                try:
+                    super().export(metrics_data, timeout_millis=timeout_millis)
+                except Exception as e:
+                    print(f"Error exporting metrics: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def export(self, metrics_data, timeout_millis: float = 10_000, **kwargs) -> MetricExportResult:
+        """Queue a batch for export without blocking"""
+        if self._discarded:
+            return MetricExportResult.FAILURE
+        try:
+            self._queue.put_nowait((metrics_data, timeout_millis))
+        except queue.Full:
+            self.dropped_batches += 1
+            now = time.monotonic()
+            if self._drop_warned_at is None or now - self._drop_warned_at >= self.DROP_WARNING_INTERVAL:
+                self._drop_warned_at = now
+                print(f"Warning: metric export queue full, {self.dropped_batches} batches dropped so far.")
+            return MetricExportResult.FAILURE
+        return MetricExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: float = 10_000) -> bool:
+        """Wait for queued batches to be sent"""
+        if self._discarded:
+            return True
+        deadline = time.monotonic() + timeout_millis / 1000
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return super().force_flush(timeout_millis)
+
+    def shutdown(self, timeout_millis: float = 30_000, **kwargs) -> None:
+        """Send what is queued, then stop the export thread and the exporter"""
+        if self._discarded:
+            return
+        self.force_flush(timeout_millis)
+        try:
+            self._queue.put_nowait(self._STOP)
+        except queue.Full:
+            pass
+        super().shutdown(timeout_millis=timeout_millis, **kwargs)
+
+    def discard(self):
+        """
+        Stop exporting without sending anything more, for a pipeline being replaced
+        Queued batches are dropped and the pooled session is left untouched: after
+        a fork both belong to the parent process.
+        """
+        self._discarded = True
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+        try:
+            self._queue.put_nowait(self._STOP)
+        except queue.Full:
+            pass
+
+
 class TelemetryManager:
     """Manages OpenTelemetry metrics for the Brother Label API"""
 
     def __init__(self):
-        self.enabled = os.getenv('OTEL_ENABLED', 'false').lower() == 'true'
+        # Snapshot the configuration once
+        env = {name: os.getenv(name, default) for name, default in _ENV_DEFAULTS.items()}
+        self.enabled = env['OTEL_ENABLED'].lower() == 'true'
+
+        # Metric names (comma separated) to turn off, e.g. a label cardinality culprit
+        self._disabled_metrics = frozenset(
+            name.strip() for name in env['OTEL_METRIC_DISABLED'].split(',') if name.strip()
+        )
+
+        # Known attribute values (None = unrestricted); see set_attribute_limits()
+        self._allowed_printer_ids: Optional[FrozenSet[str]] = None
+        self._allowed_api_key_names: Optional[FrozenSet[str]] = None
+
+        # This process's own export pipeline; see _start_export()
+        self._env = env
+        self._exports = False
+        self._meter_provider: Optional[MeterProvider] = None
 
         if not self.enabled:
             # Create no-op metrics
             self._setup_noop_metrics()
             return
 
-        # Configure OTLP exporter
-        endpoint = os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT')
-        headers = os.getenv('OTEL_EXPORTER_OTLP_HEADERS', '')
+        # Another SDK provider (e.g. from opentelemetry-instrument) already exports;
+        # record into it rather than exporting everything twice
+        if isinstance(metrics.get_meter_provider(), MeterProvider):
+            self.meter = metrics.get_meter(__name__)
+            self._setup_metrics()
+            return
 
-        if not endpoint:
+        if not env['OTEL_EXPORTER_OTLP_ENDPOINT']:
             print("Warning: OTEL_ENABLED=true but OTEL_EXPORTER_OTLP_ENDPOINT not set. Metrics disabled.")
+            # Disabled in full, so the TelemetryQueue never starts a thread for no-ops
+            self.enabled = False
             self._setup_noop_metrics()
             return
 
-        # Parse headers (format: "key1=value1,key2=value2")
-        headers_dict = {}
-        if headers:
-            for header in headers.split(','):
-                if '=' in header:
-                    key, value = header.split('=', 1)
-                    headers_dict[key.strip()] = value.strip()
+        self._exports = True
+        self._start_export()
 
-        # Create resource with service information
+    def _start_export(self):
+        """Create this process's OTLP exporter, metric reader and meter provider, and the instruments"""
+        env = self._env
+
+        # Create resource with service information; each process exports its own series
         resource = Resource.create({
-            "service.name": os.getenv('OTEL_SERVICE_NAME', 'brother-label-api'),
+            "service.name": env['OTEL_SERVICE_NAME'],
             "service.version": "0.9.5.1",
-            "deployment.environment": os.getenv('OTEL_ENVIRONMENT', 'production'),
+            "service.instance.id": f"{socket.gethostname()}-{os.getpid()}",
+            "deployment.environment": env['OTEL_ENVIRONMENT'],
         })
 
-        # Configure exporter
-        exporter = OTLPMetricExporter(
-            endpoint=endpoint,
-            headers=headers_dict,
+        # Configure exporter; batches are sent from the exporter's own thread.
+        # The HTTP exporter ignores the per-call timeout_millis, so the constructor
+        # timeout (in seconds) is what bounds each send
+        self._exporter = _AsyncOTLPMetricExporter(
+            endpoint=env['OTEL_EXPORTER_OTLP_ENDPOINT'],
+            headers=_parse_headers(env['OTEL_EXPORTER_OTLP_HEADERS']),
+            timeout=int(env['OTEL_EXPORT_TIMEOUT_MS']) / 1000,
+            session=_export_session(),
+            # Metric payloads repeat attribute keys and resource data, and compress well
+            compression=_parse_compression(env['OTEL_EXPORTER_OTLP_COMPRESSION']),
+            queue_size=int(env['OTEL_EXPORT_QUEUE_SIZE']),
         )
 
-        # Create metric reader with export interval
+        # Create metric reader with export interval; its timeout only bounds the collect
+        # and hand-off to the exporter's queue
         reader = PeriodicExportingMetricReader(
-            exporter=exporter,
-            export_interval_millis=int(os.getenv('OTEL_EXPORT_INTERVAL_MS', '60000'))
+            exporter=self._exporter,
+            export_interval_millis=int(env['OTEL_EXPORT_INTERVAL_MS']),
+            export_timeout_millis=int(env['OTEL_EXPORT_TIMEOUT_MS'])
         )
 
-        # Set up meter provider
-        meter_provider = MeterProvider(
+        # Owned rather than installed globally, which can only happen once per
+        # process; a forked worker replaces it in reinit_after_fork()
+        self._meter_provider = MeterProvider(
             resource=resource,
             metric_readers=[reader]
         )
-        metrics.set_meter_provider(meter_provider)
-
-        # Get meter for this service
-        self.meter = metrics.get_meter(__name__)
+        self.meter = self._meter_provider.get_meter(__name__)
 
         # Initialize all metrics
         self._setup_metrics()
 
-    def _setup_noop_metrics(self):
-        """Create no-op metrics when telemetry is disabled"""
-        # Get default meter (no-op)
-        self.meter = metrics.get_meter(__name__)
-        self._setup_metrics()
-
-    def _setup_metrics(self):
-        """Initialize all metrics (counters, histograms, gauges)"""
-
-        # === COUNTERS ===
-        self.api_requests_counter = self.meter.create_counter(
-            name="api.requests.total",
-            description="Total number of API requests",
-            unit="1"
-        )
-
-        self.prints_total_counter = self.meter.create_counter(
-            name="prints.total",
-            description="Total number of print jobs attempted",
-            unit="1"
-        )
-
-        self.prints_success_counter = self.meter.create_counter(
-            name="prints.success",
-            description="Total number of successful print jobs",
-            unit="1"
-        )
-
-        self.prints_failed_counter = self.meter.create_counter(
-            name="prints.failed",
-            description="Total number of failed print jobs",
-            unit="1"
-        )
+    def stop_export(self):
+        """
+        Shut down this process's export pipeline
+        Used in the gunicorn master once it has loaded the app: it serves no
+        requests, and its workers export under their own service.instance.id.
+        """
+        if self._meter_provider is None:
+            return
+        # Discard first so the reader's final collection on shutdown isn't sent
+        self._exporter.discard()
+        self._meter_provider.shutdown()
+        self._meter_provider = None
+
+    def reinit_after_fork(self):
+        """
+        Give a forked worker its own export pipeline (gunicorn post_fork hook)
+        The one inherited from the master would share its pooled HTTP connection
+        and resource identity.
+        """
+        if not self._exports:
+            return
 
-        self.errors_counter = self.meter.create_counter(
-            name="errors.total",
-            description="Total number of errors by type",
-            unit="1"
-        )
+        self.stop_export()
+        with self._config_gauges_lock:
+            counts = (self._printers_configured, self._api_keys_configured)
 
-        # === HISTOGRAMS ===
-        self.http_request_duration = self.meter.create_histogram(
-            name="http.request.duration",
-            description="HTTP request duration in milliseconds",
-            unit="ms"
-        )
+        # New instruments start from zero, so re-apply the config counts
+        self._start_export()
+        self.update_config_gauges(*counts)
 
-        self.print_duration = self.meter.create_histogram(
-            name="print.duration",
-            description="Print job duration in milliseconds",
-            unit="ms"
-        )
+    def _setup_noop_metrics(self):
+        """Create no-op metrics when telemetry is disabled"""
+        # A NoOpMeter rather than the global one, whose instruments proxy to any
+        # provider installed later; these never record or register callbacks
+        self.meter = metrics.NoOpMeter(__name__)
+        self._setup_metrics()
 
-        self.image_generation_duration = self.meter.create_histogram(
-            name="image.generation.duration",
-            description="Image generation duration in milliseconds",
-            unit="ms"
-        )
+        # Nothing is exported, so skip building attributes and calling instruments at all
+        for name in self._RECORDERS:
+            setattr(self, name, _noop)
 
-        self.printer_response_time = self.meter.create_histogram(
-            name="printer.response.time",
-            description="Printer response time in milliseconds",
-            unit="ms"
-        )
+    # Instance attributes replaced by _noop when telemetry is disabled
+    _RECORDERS = (
+        '_api_requests_add', '_prints_total_add', '_prints_success_add', '_prints_failed_add',
+        '_errors_add', '_telemetry_dropped_add', '_http_request_duration_record',
+        '_print_duration_record', '_image_generation_duration_record', '_printer_response_time_record',
+        'record_api_request', 'record_print_attempt', 'record_print_success', 'record_print_failure',
+        'record_error', 'record_telemetry_dropped', 'record_http_duration', 'record_image_generation',
+        'record_printer_response',
+    )
 
-        # === GAUGES (using observable callbacks) ===
+    def _setup_metrics(self):
+        """Initialize all metrics (counters, histograms, gauges) from _INSTRUMENTS"""
+        noop_meter = metrics.NoOpMeter(__name__)
+        for attribute, kind, name, description, unit in _INSTRUMENTS:
+            # Instruments listed in OTEL_METRIC_DISABLED are created but never record
+            meter = noop_meter if name in self._disabled_metrics else self.meter
+            create = getattr(meter, f'create_{kind}')
+            setattr(self, attribute, create(name=name, description=description, unit=unit))
+
+        # Config counts only change with the config, so gauges are up-down counters
+        # adjusted then rather than observed through callbacks on every collection
         self._printers_configured = 0
         self._api_keys_configured = 0
-
-        self.meter.create_observable_gauge(
-            name="printers.configured",
-            description="Number of configured printers",
-            unit="1",
-            callbacks=[self._get_printers_configured]
-        )
-
-        self.meter.create_observable_gauge(
-            name="api_keys.configured",
-            description="Number of configured API keys",
-            unit="1",
-            callbacks=[self._get_api_keys_configured]
-        )
-
-    def _get_printers_configured(self, options):
-        """Callback for printers.configured gauge"""
-        yield metrics.Observation(self._printers_configured)
-
-    def _get_api_keys_configured(self, options):
-        """Callback for api_keys.configured gauge"""
-        yield metrics.Observation(self._api_keys_configured)
+        self._config_gauges_lock = threading.Lock()
+
+        # Bound once so each recording skips the instrument attribute lookup
+        self._api_requests_add = self.api_requests_counter.add
+        self._prints_total_add = self.prints_total_counter.add
+        self._prints_success_add = self.prints_success_counter.add
+        self._prints_failed_add = self.prints_failed_counter.add
+        self._errors_add = self.errors_counter.add
+        self._telemetry_dropped_add = self.telemetry_dropped_counter.add
+        self._http_request_duration_record = self.http_request_duration.record
+        self._print_duration_record = self.print_duration.record
+        self._image_generation_duration_record = self.image_generation_duration.record
+        self._printer_response_time_record = self.printer_response_time.record
 
     def update_config_gauges(self, printers_count: int, api_keys_count: int):
         """Update gauge values for configuration counts"""
-        self._printers_configured = printers_count
-        self._api_keys_configured = api_keys_count
+        with self._config_gauges_lock:
+            self.printers_configured_gauge.add(printers_count - self._printers_configured)
+            self.api_keys_configured_gauge.add(api_keys_count - self._api_keys_configured)
+            self._printers_configured = printers_count
+            self._api_keys_configured = api_keys_count
+
+    def set_attribute_limits(self, printer_ids: Iterable[str], api_key_names: Iterable[str]):
+        """
+        Restrict printer_id and api_key_name attributes to configured values
+        Every distinct value creates metric points in the SDK, so anything else
+        is recorded as OTHER_ATTRIBUTE_VALUE.
+        """
+        self._allowed_printer_ids = frozenset(printer_ids)
+        self._allowed_api_key_names = frozenset(api_key_names)
+
+    def norm_printer_id(self, printer_id: str) -> str:
+        """Return printer_id if it is a configured printer, else OTHER_ATTRIBUTE_VALUE"""
+        allowed = self._allowed_printer_ids
+        if allowed is None or printer_id in allowed:
+            return printer_id
+        return OTHER_ATTRIBUTE_VALUE
+
+    def norm_api_key_name(self, api_key_name: Optional[str]) -> Optional[str]:
+        """Return api_key_name if it is a configured key name (or None), else OTHER_ATTRIBUTE_VALUE"""
+        allowed = self._allowed_api_key_names
+        if not api_key_name or allowed is None or api_key_name in allowed:
+            return api_key_name
+        return OTHER_ATTRIBUTE_VALUE
 
     # === Helper Methods ===
 
-    def record_api_request(self, endpoint: str, method: str, status_code: int,
-                          api_key_name: Optional[str] = None):
-        """Record an API request"""
-        attributes = {
-            "endpoint": endpoint,
-            "method": method,
-            "status_code": status_code,
-        }
-        if api_key_name:
-            attributes["api_key_name"] = api_key_name
-
-        self.api_requests_counter.add(1, attributes)
+    def record_api_request(self, attributes: Mapping[str, Any]):
+        """Record an API request (attributes from api_request_attributes())"""
+        self._api_requests_add(1, attributes)
 
     def record_print_attempt(self, printer_id: str, printer_model: str,
                             label_type: str, api_key_name: Optional[str] = None):
         """Record a print job attempt"""
-        attributes = {
-            "printer_id": printer_id,
-            "printer_model": printer_model,
-            "label_type": label_type,
-        }
-        if api_key_name:
-            attributes["api_key_name"] = api_key_name
-
-        self.prints_total_counter.add(1, attributes)
+        printer_id = self.norm_printer_id(printer_id)
+        api_key_name = self.norm_api_key_name(api_key_name)
+        self._prints_total_add(1, print_attributes(printer_id, printer_model, label_type, api_key_name))
 
     def record_print_success(self, printer_id: str, printer_model: str,
                             label_type: str, duration_ms: float,
                             api_key_name: Optional[str] = None):
         """Record a successful print job"""
-        attributes = {
-            "printer_id": printer_id,
-            "printer_model": printer_model,
-            "label_type": label_type,
-        }
-        if api_key_name:
-            attributes["api_key_name"] = api_key_name
-
-        self.prints_success_counter.add(1, attributes)
-        self.print_duration.record(duration_ms, {
-            "printer_id": printer_id,
-            "printer_model": printer_model,
-            "result": "success"
-        })
+        printer_id = self.norm_printer_id(printer_id)
+        api_key_name = self.norm_api_key_name(api_key_name)
+        self._prints_success_add(1, print_attributes(printer_id, printer_model, label_type, api_key_name))
+        self._print_duration_record(duration_ms, print_duration_attributes(printer_id, printer_model, "success"))
 
     def record_print_failure(self, printer_id: str, printer_model: str,
                             error_type: str, duration_ms: float,
                             api_key_name: Optional[str] = None):
         """Record a failed print job"""
-        attributes = {
-            "printer_id": printer_id,
-            "printer_model": printer_model,
-            "error_type": error_type,
-        }
-        if api_key_name:
-            attributes["api_key_name"] = api_key_name
-
-        self.prints_failed_counter.add(1, attributes)
-        self.print_duration.record(duration_ms, {
-            "printer_id": printer_id,
-            "printer_model": printer_model,
-            "result": "failure"
-        })
+        printer_id = self.norm_printer_id(printer_id)
+        api_key_name = self.norm_api_key_name(api_key_name)
+        self._prints_failed_add(1, print_failure_attributes(printer_id, printer_model, error_type, api_key_name))
+        self._print_duration_record(duration_ms, print_duration_attributes(printer_id, printer_model, "failure"))
 
     def record_error(self, error_type: str, endpoint: str,
                     api_key_name: Optional[str] = None):
         """Record an error"""
-        attributes = {
-            "error_type": error_type,
-            "endpoint": endpoint,
-        }
-        if api_key_name:
-            attributes["api_key_name"] = api_key_name
-
-        self.errors_counter.add(1, attributes)
-
-    def record_http_duration(self, duration_ms: float, endpoint: str,
-                            method: str, status_code: int):
-        """Record HTTP request duration"""
-        self.http_request_duration.record(duration_ms, {
-            "endpoint": endpoint,
-            "method": method,
-            "status_code": status_code
-        })
+        api_key_name = self.norm_api_key_name(api_key_name)
+        self._errors_add(1, error_attributes(error_type, endpoint, api_key_name))
+
+    def record_telemetry_dropped(self, count: int = 1):
+        """Record telemetry events dropped from the recording queue"""
+        self._telemetry_dropped_add(count)
+
+    def record_http_duration(self, duration_ms: float, attributes: Mapping[str, Any]):
+        """Record HTTP request duration (attributes from http_attributes())"""
+        self._http_request_duration_record(duration_ms, attributes)
 
     def record_image_generation(self, duration_ms: float, label_type: str):
         """Record image generation duration"""
-        self.image_generation_duration.record(duration_ms, {
+        self._image_generation_duration_record(duration_ms, {
             "label_type": label_type
         })
 
     def record_printer_response(self, duration_ms: float, printer_id: str,
                                printer_model: str):
         """Record printer response time"""
-        self.printer_response_time.record(duration_ms, {
+        self._printer_response_time_record(duration_ms, {
             "printer_id": printer_id,
             "printer_model": printer_model
         })
 
     @contextmanager
-    def measure_duration(self):
-        """Context manager to measure duration in milliseconds"""
-        start = time.time()
+    def measure_duration(self, histogram, attributes: Optional[Mapping[str, Any]] = None):
+        """
+        Context manager that records the duration of its block, in milliseconds,
+        to a histogram (e.g. self.print_duration)
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start_ns = time.perf_counter_ns()
         try:
             yield
         finally:
-            duration_ms = (time.time() - start) * 1000
+            histogram.record((time.perf_counter_ns() - start_ns) / 1_000_000, attributes)
+
+
+class TelemetryQueue:
+    """
+    Records telemetry on a background thread
+    Request threads only append (recorder, args, kwargs) tuples to a bounded ring
+    buffer (a deque with maxlen, whose appends and pops need no lock) and wake the
+    drain thread, which sleeps while the buffer is empty. The thread starts on the
+    first submit, so a gunicorn master that never records doesn't run one. When
+    the buffer is full the oldest event is dropped, and the drain thread counts it.
+    """
+
+    def __init__(self, telemetry: TelemetryManager, maxsize: int = 10000):
+        self.telemetry = telemetry
+        self.maxsize = maxsize
+        # Nothing worth offloading when metrics are no-ops
+        self.enabled = telemetry.enabled
+        self._start_lock = threading.Lock()
+
+        if self.enabled:
+            self._reset()
+            atexit.register(self.flush)
+
+    def _reset(self):
+        """Create an empty buffer; its drain thread is started by the first submit"""
+        self._buffer = deque(maxlen=self.maxsize)
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _start(self):
+        """Start the drain thread once"""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='telemetry-queue', daemon=True)
+                self._thread.start()
+
+    def reinit_after_fork(self):
+        """Drop events and thread state inherited by a forked worker (gunicorn post_fork hook)"""
+        if self.enabled:
+            self._start_lock = threading.Lock()
+            self._reset()
+
+    def _run(self):
+        """Drain the buffer whenever woken, until stopped, then once more for anything left"""
+        wakeup = self._wakeup
+        while not self._stop.is_set():
+            wakeup.wait()
+            # Cleared before draining, so an event appended meanwhile wakes the next pass
+            wakeup.clear()
+            self._drain()
+        self._drain()
+
+    def _drain(self):
+        """Invoke every buffered recorder, oldest first, then count dropped events"""
+        buffer = self._buffer
+        while True:
+            try:
+                recorder, args, kwargs = buffer.popleft()
+            except IndexError:
+                break
+
+            try:
+                recorder(*args, **kwargs)
+            except Exception as e:
+                print(f"Error recording telemetry: {str(e)}")
+
+        if self._dropped:
+            with self._dropped_lock:
+                dropped, self._dropped = self._dropped, 0
+            self.telemetry.record_telemetry_dropped(dropped)
+
+    def submit(self, recorder: Callable, *args, **kwargs):
+        """Queue a telemetry recorder call (e.g. telemetry.record_error) without blocking"""
+        if not self.enabled:
+            recorder(*args, **kwargs)
+            return
+
+        if self._thread is None:
+            self._start()
+
+        buffer = self._buffer
+        if len(buffer) == self.maxsize:
+            # Appending evicts the oldest event; only this rare path takes a lock
+            with self._dropped_lock:
+                self._dropped += 1
+        buffer.append((recorder, args, kwargs))
+
+        # is_set() is a plain read, so a busy buffer doesn't take the Event's lock per event
+        if not self._wakeup.is_set():
+            self._wakeup.set()
+
+    def flush(self, timeout: float = 2.0):
+        """Record everything still queued and stop the drain thread"""
+        if not self.enabled or self._thread is None or not self._thread.is_alive():
+            return
+
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+
+
+class PrintSpan:
+    """
+    Context manager that records telemetry for a single print job
+    The attempt is recorded on entry; on exit the job is recorded as a success
+    or failure based on .result, or as an 'exception' failure if one escapes.
+    Leaving .result unset records nothing further.
+    """
+
+    def __init__(self, telemetry_queue: TelemetryQueue, printer_id: str,
+                 printer_model: str, label_type: str, endpoint: str,
+                 api_key_name: Optional[str] = None, start_ns: Optional[int] = None):
+        self._queue = telemetry_queue
+        self._telemetry = telemetry_queue.telemetry
+        self.printer_id = self._telemetry.norm_printer_id(printer_id)
+        self.printer_model = printer_model
+        self.label_type = label_type
+        self.endpoint = endpoint
+        self.api_key_name = self._telemetry.norm_api_key_name(api_key_name)
+        self.result: Optional[Dict[str, Any]] = None
+        self._start_ns = start_ns
+
+        # Shared by the attempt and success counters
+        self.attributes = print_attributes(self.printer_id, printer_model, label_type, self.api_key_name)
+
+    def __enter__(self) -> 'PrintSpan':
+        self._entered_ns = time.perf_counter_ns()
+        if self._start_ns is None:
+            self._start_ns = self._entered_ns
+
+        self._queue.submit(self._telemetry._prints_total_add, 1, self.attributes)
+        return self
+
+    def mark_image_gen_done(self):
+        """Record image generation duration, measured from entering the span"""
+        duration_ms = (time.perf_counter_ns() - self._entered_ns) / 1_000_000
+        self._queue.submit(self._telemetry.record_image_generation, duration_ms, self.label_type)
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        duration_ms = (time.perf_counter_ns() - self._start_ns) / 1_000_000
+
+        if exc_type is not None:
+            self._record_failure('exception', duration_ms)
+        elif self.result is not None:
+            if self.result['success']:
+                self._queue.submit(self._telemetry._prints_success_add, 1, self.attributes)
+                self._queue.submit(
+                    self._telemetry._print_duration_record, duration_ms,
+                    print_duration_attributes(self.printer_id, self.printer_model, "success")
+                )
+            else:
+                self._record_failure(self.result.get('error_type', 'unknown_error'), duration_ms)
+
+        return False
+
+    def _record_failure(self, error_type: str, duration_ms: float):
+        """Record a failed print job and the matching error"""
+        self._queue.submit(
+            self._telemetry.record_print_failure,
+            printer_id=self.printer_id,
+            printer_model=self.printer_model,
+            error_type=error_type,
+            duration_ms=duration_ms,
+            api_key_name=self.api_key_name
+        )
+        self._queue.submit(self._telemetry.record_error, error_type, self.endpoint, self.api_key_name)
 
 
 # Global telemetry instance
 _telemetry: Optional[TelemetryManager] = None
+_telemetry_lock = threading.Lock()
 
 
 def init_telemetry() -> TelemetryManager:
     """Initialize telemetry (call once at application startup)"""
     global _telemetry
     if _telemetry is None:
-        _telemetry = TelemetryManager()
+        # Concurrent first calls must not build two managers (and meter providers)
+        with _telemetry_lock:
+            if _telemetry is None:
+                _telemetry = TelemetryManager()
     return _telemetry
 
 
@@ -7,6 +7,8 @@ Run this before starting the API server
 
 import sys
 import os
+import importlib.util
+from importlib.metadata import version as installed_version, PackageNotFoundError
 
 # Fix Windows console encoding for Unicode characters
 if sys.platform == 'win32':
@@ -15,6 +17,72 @@ if sys.platform == 'win32':
         import io
         sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
+def _installed_version(distribution):
+    """Version of an installed distribution from its metadata, without importing it"""
+    try:
+        return installed_version(distribution)
+    except PackageNotFoundError:
+        return None
+
+
+def _check_requirements(path='requirements.txt'):
+    """
+    Compare installed versions against requirements.txt from package metadata
+    Returns a list of problems, or None if the check can't run
+    """
+    try:
+        from packaging.requirements import Requirement, InvalidRequirement
+    except ImportError:
+        return None
+
+    problems = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            # Skip blanks and pip options such as -e ./brother_ql_fixed
+            if not line or line.startswith('-'):
+                continue
+
+            try:
+                req = Requirement(line)
+            except InvalidRequirement:
+                continue
+            if req.marker is not None and not req.marker.evaluate():
+                continue
+
+            installed = _installed_version(req.name)
+            if installed is None:
+                problems.append(f"{req.name} not installed (requires {req.specifier or 'any version'})")
+            elif not req.specifier.contains(installed, prereleases=True):
+                problems.append(f"{req.name} {installed} installed, requires {req.specifier}")
+    return problems
+
+
+def _threshold_mismatches():
+    """
+    Grey levels where the API's text threshold and brother_ql's own disagree
+    Each level is sent through brother_ql as a uniform raster line, uncompressed,
+    and compared with the LUT used by _to_monochrome
+    """
+    from PIL import Image
+    from brother_ql.raster import BrotherQLRaster
+    from brother_ql.conversion import convert
+    from brother_ql_handler import BLACK_THRESHOLD, _threshold_lut
+
+    lut = _threshold_lut(BLACK_THRESHOLD)
+    mismatches = []
+    for level in range(256):
+        data = convert(
+            BrotherQLRaster('QL-820NWB'), [Image.new('L', (696, 1), level)], '62',
+            threshold=BLACK_THRESHOLD, dither=False, compress=False, rotate='0'
+        )
+        # Uncompressed raster line: 'g' 0x00 0x5a followed by 90 bytes of dots
+        line = data.partition(b'g\x00\x5a')[2][:90]
+        if any(line) != (lut[level] == 0):
+            mismatches.append(level)
+    return mismatches
+
+
 def test_installation():
     """Test all required dependencies"""
     print("Brother Label API - Installation Test")
@@ -25,10 +93,11 @@ def test_installation():
     all_ok = True
 
     # Test brother_ql
-    print("[1/5] Testing brother_ql library...")
+    print("[1/6] Testing brother_ql library...")
     try:
-        import brother_ql
-        version = getattr(brother_ql, '__version__', 'version unknown')
+        version = _installed_version('brother_ql')
+        if version is None:
+            raise ImportError("No module named 'brother_ql'")
         print(f"  ✓ brother_ql installed: {version}")
 
         # Verify it's the fixed version
@@ -44,12 +113,12 @@ def test_installation():
             all_ok = False
 
         # Check for python-future dependency (should NOT be present)
-        try:
-            import future
+        if importlib.util.find_spec('future') is not None:
             print(f"  ⚠ WARNING: python-future is installed (should not be needed)")
-        except ImportError:
+        else:
             print(f"  ✓ python-future not installed (correct!)")
 
+        # Importing is only needed to exercise the library
         from brother_ql.raster import BrotherQLRaster
         from brother_ql.conversion import convert
 
@@ -60,6 +129,17 @@ def test_installation():
         except Exception as e:
             print(f"  ⚠ QL-820NWB test failed: {e}")
 
+        # Text labels are thresholded before reaching brother_ql, with its cutoff
+        try:
+            mismatches = _threshold_mismatches()
+            if mismatches:
+                print(f"  ✗ Text threshold differs from brother_ql at {len(mismatches)} grey level(s)")
+                all_ok = False
+            else:
+                print(f"  ✓ Text threshold matches brother_ql")
+        except Exception as e:
+            print(f"  ⚠ Threshold check failed: {e}")
+
     except ImportError as e:
         print(f"  ✗ brother_ql not available: {e}")
         print(f"  → Install with: pip install -r requirements.txt")
@@ -71,11 +151,14 @@ def test_installation():
     print()
 
     # Test Pillow
-    print("[2/5] Testing Pillow (PIL) library...")
+    print("[2/6] Testing Pillow (PIL) library...")
     try:
-        import PIL
-        from PIL import Image, ImageDraw, ImageFont
-        print(f"  ✓ Pillow installed: {PIL.__version__}")
+        pillow_version = _installed_version('Pillow')
+        if pillow_version is None:
+            raise ImportError("No module named 'PIL'")
+        print(f"  ✓ Pillow installed: {pillow_version}")
+
+        from PIL import Image
 
         # Test image creation
         img = Image.new('RGB', (100, 50), color='white')
@@ -92,19 +175,13 @@ def test_installation():
     print()
 
     # Test Flask
-    print("[3/5] Testing Flask framework...")
+    print("[3/6] Testing Flask framework...")
     try:
-        import flask
-        try:
-            from importlib.metadata import version
-            flask_version = version('flask')
-        except Exception:
-            flask_version = getattr(flask, '__version__', 'unknown')
+        flask_version = _installed_version('flask')
+        if flask_version is None:
+            raise ImportError("No module named 'flask'")
         print(f"  ✓ Flask installed: {flask_version}")
 
-        from flask import Flask, request, jsonify
-        print(f"  ✓ Flask imports work")
-
     except ImportError as e:
         print(f"  ✗ Flask not available: {e}")
         print(f"  → Install with: pip install Flask")
@@ -116,24 +193,47 @@ def test_installation():
     print()
 
     # Test labelprinterkit (optional)
-    print("[4/5] Testing labelprinterkit (optional for PT series)...")
-    try:
-        import labelprinterkit
+    print("[4/6] Testing labelprinterkit (optional for PT series)...")
+    if _installed_version('labelprinterkit') is not None:
         print(f"  ✓ labelprinterkit installed")
-    except ImportError:
+    else:
         print(f"  ℹ labelprinterkit not installed (only needed for PT series)")
         print(f"  → Optional install: pip install labelprinterkit")
 
     print()
 
+    # Compare installed versions with requirements.txt
+    print("[5/6] Checking installed versions against requirements.txt...")
+    if not os.path.exists('requirements.txt'):
+        print(f"  ℹ requirements.txt not found (run from the project directory)")
+    else:
+        problems = _check_requirements()
+        if problems is None:
+            print(f"  ℹ packaging not installed, skipping version check")
+            print(f"  → Optional install: pip install packaging")
+        elif problems:
+            for problem in problems:
+                print(f"  ✗ {problem}")
+            print(f"  → Install with: pip install -r requirements.txt")
+            all_ok = False
+        else:
+            print(f"  ✓ Installed versions match requirements.txt")
+
+    print()
+
     # Test config file
-    print("[5/5] Testing configuration...")
+    print("[6/6] Testing configuration...")
     if os.path.exists('config.json'):
         print(f"  ✓ config.json exists")
         try:
-            import json
-            with open('config.json', 'r') as f:
-                config = json.load(f)
+            try:
+                import orjson
+                with open('config.json', 'rb') as f:
+                    config = orjson.loads(f.read())
+            except ImportError:
+                import json
+                with open('config.json', 'r') as f:
+                    config = json.load(f)
 
             if 'api_keys' in config and len(config['api_keys']) > 0:
                 # Check if using new format with named keys